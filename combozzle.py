@@ -23,6 +23,8 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 THE SOFTWARE.
 """
+import os
+import pickle
 import logging
 import yaml
 import numpy as np
@@ -37,7 +39,7 @@ from grudge.eager import EagerDGDiscretization
 from grudge.dof_desc import DTAG_BOUNDARY
 from grudge.shortcuts import make_visualizer
 
-from logpyle import IntervalTimer, set_dt
+from logpyle import IntervalTimer, PostLogQuantity, MultiPostLogQuantity, set_dt
 from mirgecom.euler import extract_vars_for_logging, units_for_logging
 from mirgecom.euler import euler_operator
 from mirgecom.navierstokes import ns_operator
@@ -46,8 +48,9 @@ from mirgecom.simutil import (
     generate_and_distribute_mesh,
     write_visfile,
 )
-from mirgecom.io import make_init_message
+from mirgecom.io import make_init_message, make_rank_fname, make_par_fname
 from mirgecom.mpi import mpi_entry_point
+from combozzle_viz import write_host_vtk_file
 from mirgecom.integrators import (
     rk4_step, euler_step,
     lsrk54_step, lsrk144_step
@@ -73,7 +76,8 @@ from mirgecom.logging_quantities import (
     logmgr_add_many_discretization_quantities,
     logmgr_add_cl_device_info,
     logmgr_add_device_memory_usage,
-    set_sim_state
+    set_sim_state,
+    LogUserQuantity
 )
 import cantera
 
@@ -86,6 +90,140 @@ class MyRuntimeError(RuntimeError):
     pass
 
 
+class StepThroughput(PostLogQuantity):
+    """Logging support for the rate at which a fixed amount of work per step
+    is done, measured over the same interval as the step time.
+    """
+
+    def __init__(self, name, work_per_step, unit, description):
+        PostLogQuantity.__init__(self, name, unit, description)
+        self._work_per_step = work_per_step
+        self._step_start_time = None
+
+    def prepare_for_tick(self):
+        from time import perf_counter
+        self._step_start_time = perf_counter()
+
+    def __call__(self):
+        from time import perf_counter
+        if self._step_start_time is None:
+            return None
+        return self._work_per_step / (perf_counter() - self._step_start_time)
+
+
+class CountingAllocator:
+    """Wrap a :class:`pyopencl.tools.MemoryPool`, counting its allocations.
+
+    An allocation that the pool cannot serve from its held blocks (and so
+    passes on to the device allocator) counts as a miss. The pool keeps no
+    statistics of its own on this, so misses are inferred from growth in its
+    :attr:`managed_bytes` during the allocation. An allocation that the pool
+    only serves after freeing held blocks (when the device allocator is out
+    of memory) may not grow it, and is then not counted. The pool's own
+    attributes are available through the wrapper.
+
+    The counters are cumulative over the life of the wrapper, which may be
+    shared by several cases; use differences of them.
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.nallocs = 0
+        self.nmisses = 0
+        self.miss_bytes = 0
+        self.peak_managed_bytes = 0
+        self.peak_active_bytes = 0
+
+    def __call__(self, size):
+        managed_bytes = self.pool.managed_bytes
+        buf = self.pool(size)
+        self.nallocs += 1
+        if self.pool.managed_bytes > managed_bytes:
+            self.nmisses += 1
+            self.miss_bytes += self.pool.managed_bytes - managed_bytes
+        self.peak_managed_bytes = max(self.peak_managed_bytes,
+                                      self.pool.managed_bytes)
+        self.peak_active_bytes = max(self.peak_active_bytes,
+                                     self.pool.active_bytes)
+        return buf
+
+    def reset_peaks(self):
+        self.peak_managed_bytes = self.pool.managed_bytes
+        self.peak_active_bytes = self.pool.active_bytes
+
+    def __getattr__(self, name):
+        return getattr(self.pool, name)
+
+
+class MemoryPoolTelemetry(MultiPostLogQuantity):
+    """Logging support for the memory pool behind a :class:`CountingAllocator`.
+
+    Logs the bytes held (free) and active (in use) in the pool at the end of
+    each step, the peaks of the bytes it manages (held and active) and of the
+    active bytes during the step, and the numbers of allocations,
+    frees and misses (and the bytes newly allocated from the device) during
+    the step. Frees are the allocations less the growth in the pool's active
+    blocks, and so count all blocks returned to the pool during the step,
+    assuming that all of the allocations of the step go through the
+    *allocator*. Counts are relative to the creation of the telemetry (for
+    the first step) or the start of the step, since the *allocator* may be
+    shared with earlier cases.
+    """
+
+    def __init__(self, allocator):
+        MultiPostLogQuantity.__init__(self,
+            names=["pool_held_bytes", "pool_active_bytes",
+                   "pool_peak_bytes", "pool_peak_active_bytes",
+                   "pool_allocs", "pool_frees", "pool_misses",
+                   "pool_miss_bytes"],
+            units=["B", "B", "B", "B", "1", "1", "1", "B"],
+            descriptions=[
+                "Bytes held (free) in the memory pool",
+                "Bytes in use from the memory pool",
+                "Peak bytes managed by the memory pool (held and active)",
+                "Peak bytes in use from the memory pool",
+                "Allocations from the memory pool",
+                "Frees to the memory pool",
+                "Allocations passed on to the device allocator",
+                "Bytes allocated from the device"])
+        self._allocator = allocator
+        self._step_start_counts = self._get_counts()
+
+    def _get_counts(self):
+        allocator = self._allocator
+        return (allocator.nallocs, allocator.pool.active_blocks,
+                allocator.nmisses, allocator.miss_bytes)
+
+    def prepare_for_tick(self):
+        self._allocator.reset_peaks()
+        self._step_start_counts = self._get_counts()
+
+    def __call__(self):
+        pool = self._allocator.pool
+        held_bytes = pool.managed_bytes - pool.active_bytes
+        nallocs, nactive_blocks, nmisses, miss_bytes = [
+            count - start_count for count, start_count
+            in zip(self._get_counts(), self._step_start_counts)]
+        return [held_bytes, pool.active_bytes,
+                self._allocator.peak_managed_bytes,
+                self._allocator.peak_active_bytes,
+                nallocs, nallocs - nactive_blocks, nmisses, miss_bytes]
+
+
+class AllocationCounter(PostLogQuantity):
+    """Logging support for a count of allocations per step."""
+
+    def __init__(self, name, description):
+        PostLogQuantity.__init__(self, name, "1", description)
+        self.count = 0
+
+    def prepare_for_tick(self):
+        self.count = 0
+
+    def __call__(self):
+        return self.count
+
+
 # Box grid generator widget lifted from @majosm and slightly bent
 def _get_box_mesh(dim, a, b, n, t=None, periodic=None):
     if periodic is None:
@@ -101,6 +239,819 @@ def _get_box_mesh(dim, a, b, n, t=None, periodic=None):
                periodic=periodic)
 
 
+def _get_box_block_shape(ncells_axis, nparts, max_split_axes=None):
+    """Split *nparts* into per-axis block counts with the smallest cut area.
+
+    If *max_split_axes* is given, at most that many axes are split (e.g. 1
+    for slabs, 2 for pencils).
+    """
+    dim = len(ncells_axis)
+    if max_split_axes is None:
+        max_split_axes = dim
+
+    def factorizations(n, ndims):
+        if ndims == 1:
+            yield (n,)
+            return
+        for f in range(1, n+1):
+            if n % f == 0:
+                for rest in factorizations(n // f, ndims-1):
+                    yield (f,) + rest
+
+    best_shape = None
+    best_area = None
+    for shape in factorizations(nparts, dim):
+        if any(nb > nc for nb, nc in zip(shape, ncells_axis)):
+            continue
+        if sum(nb > 1 for nb in shape) > max_split_axes:
+            continue
+        # internal cut area, measured in element faces
+        area = sum((shape[i] - 1)*np.prod([ncells_axis[j] for j in range(dim)
+                                           if j != i])
+                   for i in range(dim))
+        if best_area is None or area < best_area:
+            best_shape = shape
+            best_area = area
+
+    if best_shape is None:
+        raise MyRuntimeError(f"Cannot split {ncells_axis} cells into {nparts} "
+                             "blocks.")
+    return best_shape
+
+
+def _get_box_block_extent(ncells, nblocks, iblock):
+    """Return the cell range [start, stop) of block *iblock* along an axis."""
+    base, extra = divmod(ncells, nblocks)
+    start = iblock*base + min(iblock, extra)
+    return start, start + base + (1 if iblock < extra else 0)
+
+
+def _get_box_block_partition(mesh, a, b, ncells_axis, block_shape):
+    """Assign the elements of a box *mesh* to blocks by their centroids.
+
+    Returns the part (i.e. rank) of each element, with the blocks numbered
+    in the same (C) order as in :func:`_get_distributed_box_mesh`.
+    """
+    centroids = np.concatenate([np.mean(mesh.vertices[:, grp.vertex_indices],
+                                        axis=-1)
+                                for grp in mesh.groups], axis=-1)
+
+    block_index = []
+    for i, (ncells, nblocks) in enumerate(zip(ncells_axis, block_shape)):
+        icell = np.clip(
+            np.floor((centroids[i] - a[i]) / (b[i] - a[i]) * ncells),
+            0, ncells - 1).astype(np.int64)
+        block_starts = [_get_box_block_extent(ncells, nblocks, iblock)[0]
+                        for iblock in range(nblocks)]
+        block_index.append(np.searchsorted(block_starts, icell,
+                                           side="right") - 1)
+
+    return np.ravel_multi_index(block_index, block_shape)
+
+
+def _generate_and_distribute_box_mesh(comm, generate_mesh, a, b, ncells_axis,
+                                      block_shape):
+    """Generate a box mesh on rank 0 and distribute it in blocks.
+
+    Like :func:`~mirgecom.simutil.generate_and_distribute_mesh`, but with a
+    structured partition in place of the graph partitioner. Returns
+    *(local_mesh, global_nelements)*, where *global_nelements* is only
+    valid on rank 0.
+    """
+    from meshmode.distributed import MPIMeshDistributor
+    mesh_dist = MPIMeshDistributor(comm)
+
+    global_nelements = 0
+    if mesh_dist.is_mananger_rank():
+        mesh = generate_mesh()
+        global_nelements = mesh.nelements
+        part_per_element = _get_box_block_partition(mesh, a, b, ncells_axis,
+                                                    block_shape)
+        local_mesh = mesh_dist.send_mesh_parts(mesh, part_per_element,
+                                               comm.Get_size())
+        del mesh
+    else:
+        local_mesh = mesh_dist.receive_mesh_part()
+
+    return local_mesh, global_nelements
+
+
+def _get_distributed_box_mesh(comm, dim, a, b, n, periodic=None,
+                              block_shape=None):
+    """Generate each rank's block of a box mesh without a global mesh.
+
+    Each rank builds only its own structured sub-box from the global
+    axis coordinates, then matches the faces on its cut planes with those
+    of its neighboring ranks (exchanging only face-sized data) to build
+    the inter-rank adjacency.  Returns *(local_mesh, global_nelements)*
+    like :func:`~mirgecom.simutil.generate_and_distribute_mesh`.
+    """
+    from meshmode.mesh import (
+        BTAG_PARTITION,
+        BTAG_REALLY_ALL,
+        BoundaryAdjacencyGroup,
+        InterPartAdjacencyGroup
+    )
+    from meshmode.mesh.generation import generate_box_mesh
+    from meshmode.mesh.tools import AffineMap
+
+    rank = comm.Get_rank()
+    nparts = comm.Get_size()
+    if periodic is None:
+        periodic = (False,)*dim
+
+    ncells_axis = [npts - 1 for npts in n]
+    if block_shape is None:
+        block_shape = _get_box_block_shape(ncells_axis, nparts)
+    block_index = np.unravel_index(rank, block_shape)
+
+    # Slice the (1D, cheap) global axis coordinates so that neighboring
+    # ranks agree bitwise on the coordinates of their shared vertices
+    axis_coords = []
+    local_periodic = []
+    for i in range(dim):
+        start, stop = _get_box_block_extent(ncells_axis[i], block_shape[i],
+                                            block_index[i])
+        axis_coords.append(np.linspace(a[i], b[i], n[i])[start:stop+1])
+        local_periodic.append(bool(periodic[i]) and block_shape[i] == 1)
+
+    dim_names = ["x", "y", "z"]
+    bttf = {}
+    for i in range(dim):
+        bttf["-"+str(i+1)] = ["-"+dim_names[i]]
+        bttf["+"+str(i+1)] = ["+"+dim_names[i]]
+    local_mesh = generate_box_mesh(axis_coords, periodic=tuple(local_periodic),
+                                   boundary_tag_to_face=bttf)
+
+    # {{{ find the faces on the cut planes
+
+    tol = 1e-3*min(np.min(np.diff(coords)) for coords in axis_coords)
+    face_vertices = []
+    for grp in local_mesh.groups:
+        fvis = grp.face_vertex_indices()
+        face_vertices.append([
+            local_mesh.vertices[:, grp.vertex_indices[:, fvi]]
+            for fvi in fvis])
+
+    # cuts: (axis, side) -> (neighbor rank, aff_map offset)
+    cuts = {}
+    for i in range(dim):
+        nb = block_shape[i]
+        if nb == 1:
+            continue
+        for side in (-1, 1):
+            nbr_index = list(block_index)
+            nbr_index[i] = block_index[i] + side
+            offset = np.zeros(dim)
+            if nbr_index[i] < 0 or nbr_index[i] >= nb:
+                if not periodic[i]:
+                    continue
+                nbr_index[i] = nbr_index[i] % nb
+                offset[i] = -side*(b[i] - a[i])
+            cuts[i, side] = (int(np.ravel_multi_index(nbr_index, block_shape)),
+                             offset)
+
+    def get_cut_faces(axis, side):
+        plane = axis_coords[axis][0 if side < 0 else -1]
+        result = []
+        for igrp, grp_face_verts in enumerate(face_vertices):
+            for iface, verts in enumerate(grp_face_verts):
+                on_plane = np.all(np.abs(verts[axis] - plane) < tol, axis=-1)
+                els, = np.where(on_plane)
+                result.append((igrp, iface, els,
+                               np.mean(verts[:, els], axis=-1).T))
+        return result
+
+    # }}}
+
+    # {{{ exchange cut faces with neighbors and match them up
+
+    def sorted_faces(faces, axis, shift):
+        igrps = np.concatenate(
+            [np.full(len(els), igrp) for igrp, _, els, _ in faces])
+        ifaces = np.concatenate(
+            [np.full(len(els), iface) for _, iface, els, _ in faces])
+        els = np.concatenate([els for _, _, els, _ in faces])
+        keys = np.rint(
+            (np.concatenate([c for _, _, _, c in faces]) + shift)
+            / tol).astype(np.int64)
+        keys = np.delete(keys, axis, axis=1)
+        order = np.lexsort(keys.T[::-1])
+        return igrps[order], ifaces[order], els[order], keys[order]
+
+    base_tag = 17000
+    cut_faces = {}
+    send_reqs = []
+    for (axis, side), (nbr_rank, _) in cuts.items():
+        cut_faces[axis, side] = get_cut_faces(axis, side)
+        send_reqs.append(comm.isend(
+            [(igrp, iface, els, centroids)
+             for igrp, iface, els, centroids in cut_faces[axis, side]],
+            dest=nbr_rank, tag=base_tag + 2*axis + (side > 0)))
+
+    inter_part_groups = {}
+    for (axis, side), (nbr_rank, offset) in cuts.items():
+        remote_faces = comm.recv(source=nbr_rank,
+                                 tag=base_tag + 2*axis + (-side > 0))
+
+        igrps, ifaces, els, keys = sorted_faces(cut_faces[axis, side], axis,
+                                                offset)
+        _, nbr_ifaces, nbr_els, nbr_keys = sorted_faces(remote_faces, axis, 0)
+        if keys.shape != nbr_keys.shape or np.any(keys != nbr_keys):
+            raise MyRuntimeError(f"{rank=}: faces on cut ({axis=}, {side=}) "
+                                 f"do not match those of rank {nbr_rank}.")
+
+        key = (nbr_rank, tuple(offset))
+        for igrp in np.unique(igrps):
+            mask = igrps == igrp
+            inter_part_groups.setdefault(key, {}).setdefault(igrp, []).append(
+                (els[mask], ifaces[mask], nbr_els[mask], nbr_ifaces[mask]))
+
+    for req in send_reqs:
+        req.wait()
+
+    # }}}
+
+    # {{{ rebuild the facial adjacency with inter-rank groups
+
+    nfaces = [grp.nfaces for grp in local_mesh.groups]
+    cut_face_ids = [set() for _ in local_mesh.groups]
+    for faces in cut_faces.values():
+        for igrp, iface, els, _ in faces:
+            cut_face_ids[igrp].update(els*nfaces[igrp] + iface)
+
+    facial_adjacency_groups = []
+    for igrp, fagrps in enumerate(local_mesh.facial_adjacency_groups):
+        grp_cut_ids = np.array(sorted(cut_face_ids[igrp]), dtype=np.int64)
+        new_fagrps = []
+        for fagrp in fagrps:
+            if (isinstance(fagrp, BoundaryAdjacencyGroup)
+                    and fagrp.boundary_tag is not BTAG_REALLY_ALL):
+                keep = ~np.isin(
+                    fagrp.elements.astype(np.int64)*nfaces[igrp]
+                    + fagrp.element_faces, grp_cut_ids)
+                if not np.any(keep):
+                    continue
+                fagrp = BoundaryAdjacencyGroup(
+                    igroup=igrp, boundary_tag=fagrp.boundary_tag,
+                    elements=fagrp.elements[keep],
+                    element_faces=fagrp.element_faces[keep])
+            new_fagrps.append(fagrp)
+
+        for (nbr_rank, offset), grp_faces in sorted(inter_part_groups.items()):
+            if igrp not in grp_faces:
+                continue
+            els, ifaces, nbr_els, nbr_ifaces = (
+                np.concatenate(ary) for ary in zip(*grp_faces[igrp]))
+            new_fagrps.append(InterPartAdjacencyGroup(
+                igroup=igrp, boundary_tag=BTAG_PARTITION(nbr_rank),
+                ineighbor_partition=nbr_rank,
+                elements=els.astype(local_mesh.element_id_dtype),
+                element_faces=ifaces.astype(local_mesh.face_id_dtype),
+                neighbors=nbr_els.astype(local_mesh.element_id_dtype),
+                neighbor_faces=nbr_ifaces.astype(local_mesh.face_id_dtype),
+                aff_map=AffineMap(offset=np.array(offset))))
+
+        facial_adjacency_groups.append(new_fagrps)
+
+    # }}}
+
+    local_mesh = local_mesh.copy(facial_adjacency_groups=facial_adjacency_groups)
+    global_nelements = comm.allreduce(local_mesh.nelements)
+
+    return local_mesh, global_nelements
+
+
+# Copies of the state held by each integrator at once (state, stages, RHS)
+_INTEGRATOR_STATE_COPIES = {"euler": 2, "rk4": 6, "lsrk54": 3, "lsrk144": 3}
+
+
+def _estimate_memory_footprint(npts_axis, order, nspecies, integrator, nparts,
+                               use_overintegration=False, av_on=False,
+                               sponge_on=False, itemsize=8, overhead=1.,
+                               baseline=0.):
+    """Estimate the per-rank device memory (in bytes) of a box mesh run.
+
+    Counts the DOF arrays of the state, the geometry, and the working set of
+    the RHS (including the face traces, and the AV, sponge and quadrature
+    arrays when enabled), without building the mesh or discretization.
+    Returns *(total, components)*. The total scales the count by *overhead*,
+    to account for the temporaries and allocator slack it misses, and adds
+    a fixed *baseline*.
+    """
+    from math import comb, factorial
+
+    dim = len(npts_axis)
+    ncells = int(np.prod([npts - 1 for npts in npts_axis]))
+    nelements = factorial(dim) * ncells
+    nnodes = comb(order + dim, dim)
+    ndofs = nelements * nnodes / nparts
+    # face DOFs per volume DOF
+    face_ratio = (dim + 1) * comb(order + dim - 1, dim - 1) / nnodes
+    nvars = dim + 2 + nspecies
+
+    # scalars per volume DOF
+    components = {
+        "state": (nvars + 1) * _INTEGRATOR_STATE_COPIES[integrator],
+        "geometry": dim + dim*dim + 1 + face_ratio*(2*dim + 1),
+        "rhs": ((4 + nspecies) + (3 + nspecies) + (nvars + 1)*dim
+                + 2*nvars*dim + face_ratio*2*((nvars + 1)*(dim + 1))),
+    }
+    if av_on:
+        components["av"] = 2 + 2*nvars*dim + face_ratio*2*nvars*dim
+    if sponge_on:
+        components["sponge"] = 1 + 2*nvars
+    if use_overintegration:
+        # the quadrature nodes (of degree 2*order + 1) per volume node,
+        # approximately
+        quad_ratio = comb(2*order + 1 + dim, dim) / nnodes
+        components["quadrature"] = quad_ratio * (2*nvars*dim + nvars)
+
+    components = {name: ndofs * nscalars * itemsize
+                  for name, nscalars in components.items()}
+    return baseline + overhead * sum(components.values()), components
+
+
+class _MmapPickler(pickle.Pickler):
+    """Pickler that stores numpy arrays as separate ``.npy`` files."""
+
+    def __init__(self, file, array_dir):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._array_dir = array_dir
+        self._array_names = {}
+
+    def persistent_id(self, obj):
+        if not isinstance(obj, np.ndarray) or obj.dtype.hasobject:
+            return None
+        key = id(obj)
+        if key not in self._array_names:
+            name = f"array{len(self._array_names):05d}.npy"
+            np.save(os.path.join(self._array_dir, name), obj)
+            # keep *obj* alive so that its id stays unique
+            self._array_names[key] = (name, obj)
+        return ("npy", self._array_names[key][0])
+
+
+class _MmapUnpickler(pickle.Unpickler):
+    """Unpickler that memory-maps arrays stored by :class:`_MmapPickler`."""
+
+    def __init__(self, file, array_dir):
+        super().__init__(file)
+        self._array_dir = array_dir
+        self._arrays = {}
+
+    def persistent_load(self, pid):
+        kind, name = pid
+        if kind != "npy":
+            raise pickle.UnpicklingError(f"Unknown persistent id: {pid}")
+        if name not in self._arrays:
+            self._arrays[name] = np.load(os.path.join(self._array_dir, name),
+                                         mmap_mode="r")
+        return self._arrays[name]
+
+
+def _write_mmap_pickle(obj, dirname):
+    """Write *obj* to *dirname* with its arrays in memory-mappable files."""
+    os.makedirs(dirname, exist_ok=True)
+    with open(os.path.join(dirname, "data.pkl"), "wb") as f:
+        _MmapPickler(f, dirname).dump(obj)
+
+
+def _read_mmap_pickle(dirname):
+    """Read an object written by :func:`_write_mmap_pickle`."""
+    with open(os.path.join(dirname, "data.pkl"), "rb") as f:
+        return _MmapUnpickler(f, dirname).load()
+
+
+def _get_dir_nbytes(dirname):
+    return sum(os.path.getsize(os.path.join(root, fname))
+               for root, _, fnames in os.walk(dirname) for fname in fnames)
+
+
+def _get_mesh_cache_key(**params):
+    """Return a cache key (a hex digest) for the mesh parameters *params*."""
+    import hashlib
+    return hashlib.sha256(repr(sorted(params.items())).encode()).hexdigest()[:24]
+
+
+def _load_cached_mesh(comm, cache_dir, key):
+    """Load this rank's mesh from the mesh cache.
+
+    Returns *(local_mesh, global_nelements)*, or *None* on a cache miss.
+    """
+    rank = comm.Get_rank()
+    entry_dir = os.path.join(cache_dir, key)
+    meta_file = os.path.join(entry_dir, "meta.yaml")
+
+    meta = None
+    if rank == 0 and os.path.exists(meta_file):
+        with open(meta_file) as f:
+            meta = yaml.safe_load(f)
+        # mark the entry as recently used for LRU eviction
+        os.utime(meta_file)
+    meta = comm.bcast(meta, root=0)
+    if meta is None:
+        return None
+
+    local_mesh = _read_mmap_pickle(os.path.join(entry_dir, f"rank{rank:05d}"))
+    return local_mesh, meta["global_nelements"]
+
+
+def _store_cached_mesh(comm, cache_dir, key, local_mesh, global_nelements,
+                       params, max_nbytes=None, run_start_time=None):
+    """Store this rank's mesh in the mesh cache, evicting old entries.
+
+    The entry is written to a temporary directory, which is then renamed to
+    the entry, so that concurrent runs never see a partial entry. If one of
+    them stored the entry first, its copy is kept.
+
+    Least recently used entries are evicted until the cache holds at most
+    *max_nbytes*. The entry written here is never evicted, and neither are
+    entries used since *run_start_time* (a :func:`time.time`), which
+    concurrent runs may still be reading.
+    """
+    import shutil
+    import tempfile
+    rank = comm.Get_rank()
+    entry_dir = os.path.join(cache_dir, key)
+
+    tmp_entry_dir = None
+    if rank == 0:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_entry_dir = tempfile.mkdtemp(prefix=f".{key}-", dir=cache_dir)
+    tmp_entry_dir = comm.bcast(tmp_entry_dir, root=0)
+
+    _write_mmap_pickle(local_mesh, os.path.join(tmp_entry_dir,
+                                                f"rank{rank:05d}"))
+    comm.Barrier()
+
+    if rank == 0:
+        meta = {"global_nelements": int(global_nelements),
+                "params": {k: repr(v) for k, v in params.items()}}
+        with open(os.path.join(tmp_entry_dir, "meta.yaml"), "w") as f:
+            yaml.dump(meta, f)
+
+        if not os.path.exists(os.path.join(entry_dir, "meta.yaml")):
+            # an entry without meta.yaml is left over from an interrupted
+            # (non-atomic) store
+            shutil.rmtree(entry_dir, ignore_errors=True)
+        try:
+            os.replace(tmp_entry_dir, entry_dir)
+        except OSError:
+            # a concurrent run stored the entry first
+            shutil.rmtree(tmp_entry_dir, ignore_errors=True)
+
+        if max_nbytes is not None:
+            entries = []
+            for name in os.listdir(cache_dir):
+                meta_file = os.path.join(cache_dir, name, "meta.yaml")
+                if not name.startswith(".") and os.path.exists(meta_file):
+                    entries.append((os.path.getmtime(meta_file), name,
+                                    _get_dir_nbytes(os.path.join(cache_dir,
+                                                                 name))))
+            total_nbytes = sum(nbytes for _, _, nbytes in entries)
+            for mtime, name, nbytes in sorted(entries):
+                if total_nbytes <= max_nbytes:
+                    break
+                if name == key or (run_start_time is not None
+                                   and mtime >= run_start_time):
+                    continue
+                logger.info(f"Evicting mesh cache entry {name}.")
+                shutil.rmtree(os.path.join(cache_dir, name),
+                              ignore_errors=True)
+                total_nbytes -= nbytes
+
+    comm.Barrier()
+
+
+def _write_host_restart_file(rst_data, filename):
+    """Pickle restart data that has already been copied to the host."""
+    rst_dir = os.path.dirname(filename)
+    if rst_dir:
+        os.makedirs(rst_dir, exist_ok=True)
+    with open(filename, "wb") as f:
+        pickle.dump(rst_data, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _write_chunked_restart_file(rst_data, dirname, compress=False):
+    """Write host restart data as a directory of contiguous field arrays.
+
+    Every :class:`numpy.ndarray` entry of *rst_data* is stored as a field,
+    either in its own (memory-mappable) ``.npy`` file or, if *compress* is
+    set, in a compressed ``fields.npz``.  The mesh is referenced by the
+    directory name *rst_data["mesh"]*, next to *dirname*, and is written
+    there only if *rst_data* contains a *local_mesh*.
+    """
+    rst_dir = os.path.dirname(os.path.normpath(dirname))
+    if rst_data.get("local_mesh") is not None:
+        _write_mmap_pickle(rst_data["local_mesh"],
+                           os.path.join(rst_dir, rst_data["mesh"]))
+
+    fields = {name: value for name, value in rst_data.items()
+              if isinstance(value, np.ndarray)}
+    meta = {name: value for name, value in rst_data.items()
+            if name not in fields and name != "local_mesh"}
+    meta["fields"] = list(fields)
+    meta["compressed"] = compress
+
+    os.makedirs(dirname, exist_ok=True)
+    if compress:
+        np.savez_compressed(os.path.join(dirname, "fields.npz"), **fields)
+    else:
+        for name, value in fields.items():
+            np.save(os.path.join(dirname, f"{name}.npy"), value)
+
+    # meta.pkl is written last; it marks the restart as complete
+    with open(os.path.join(dirname, "meta.pkl"), "wb") as f:
+        pickle.dump(meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _read_chunked_restart_data(dirname):
+    """Read restart data written by :func:`_write_chunked_restart_file`.
+
+    The mesh arrays and uncompressed fields are memory-mapped.
+    """
+    with open(os.path.join(dirname, "meta.pkl"), "rb") as f:
+        rst_data = pickle.load(f)
+
+    rst_dir = os.path.dirname(os.path.normpath(dirname))
+    rst_data["local_mesh"] = _read_mmap_pickle(os.path.join(rst_dir,
+                                                            rst_data["mesh"]))
+    if rst_data["compressed"]:
+        with np.load(os.path.join(dirname, "fields.npz")) as fields:
+            for name in rst_data["fields"]:
+                rst_data[name] = fields[name]
+    else:
+        for name in rst_data["fields"]:
+            rst_data[name] = np.load(os.path.join(dirname, f"{name}.npy"),
+                                     mmap_mode="r")
+    return rst_data
+
+
+class AsyncRestartWriter:
+    """Write host snapshots of restart data on a background thread.
+
+    The writer is double-buffered: at most one snapshot is being written
+    while one more waits in the queue.  Submitting another snapshot blocks
+    until the writer catches up.
+
+    .. automethod:: submit
+    .. automethod:: pop_write_times
+    .. automethod:: close
+    """
+
+    def __init__(self, write_func=_write_host_restart_file):
+        import queue
+        import threading
+        self._write_func = write_func
+        self._queue = queue.Queue(maxsize=1)
+        self._lock = threading.Lock()
+        self._write_times = []
+        self._error = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        from time import perf_counter
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            rst_data, filename = item
+            start_time = perf_counter()
+            try:
+                self._write_func(rst_data, filename)
+            except Exception as e:  # noqa: B902
+                self._error = e
+            with self._lock:
+                self._write_times.append(perf_counter() - start_time)
+
+    def _check_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise MyRuntimeError("Background restart write failed.") from error
+
+    def submit(self, rst_data, filename):
+        """Queue the host restart data *rst_data* to be written to *filename*."""
+        self._check_error()
+        self._queue.put((rst_data, filename))
+
+    def pop_write_times(self):
+        """Return (and forget) the durations of the writes completed so far."""
+        with self._lock:
+            write_times, self._write_times = self._write_times, []
+        return write_times
+
+    def close(self):
+        """Finish all pending writes and stop the writer thread."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+        self._check_error()
+
+
+def _get_viz_leaves(name, field, dim):
+    """Yield *(name, field)* for the scalar and *dim*-vector parts of *field*.
+
+    Array containers are expanded with their field names joined by ``_``.
+    """
+    from meshmode.dof_array import DOFArray
+    if isinstance(field, DOFArray):
+        yield name, field
+    elif isinstance(field, np.ndarray) and field.dtype.char == "O":
+        if (len(field) == dim
+                and all(isinstance(comp, DOFArray) for comp in field)):
+            yield name, field
+        else:
+            for i, comp in enumerate(field):
+                yield from _get_viz_leaves(f"{name}_{i}", comp, dim)
+    else:
+        from arraycontext import serialize_container
+        for key, subfield in serialize_container(field):
+            yield from _get_viz_leaves(f"{name}_{key}", subfield, dim)
+
+
+def _select_viz_fields(names_and_fields, dim, viz_field_names=None):
+    """Expand *names_and_fields* into leaves, keeping those selected.
+
+    A leaf is kept if its name, or any ``_``-separated prefix of it (e.g.
+    ``cv`` for ``cv_mass``), is in *viz_field_names*. All leaves are kept
+    if *viz_field_names* is *None*.
+    """
+    def is_selected(leaf_name):
+        return viz_field_names is None or any(
+            leaf_name == sel or leaf_name.startswith(sel + "_")
+            for sel in viz_field_names)
+
+    return [(leaf_name, leaf)
+            for name, field in names_and_fields
+            for leaf_name, leaf in _get_viz_leaves(name, field, dim)
+            if is_selected(leaf_name)]
+
+
+class AsyncVisWriter:
+    """Write visualization files from host data in a process pool.
+
+    The workers run :func:`combozzle_viz.write_host_vtk_file`.  They are
+    started from a fork server, a fresh process that imports only
+    :mod:`combozzle_viz`, and never forked from this process, in which MPI
+    and CL are initialized.  Like any spawned :mod:`multiprocessing` child,
+    a worker also imports the driver module, under its ``__main__`` guard.
+    The workers only write files and never call MPI or CL.  The geometry
+    is handed to the workers through a file (see :meth:`set_geometry`).
+
+    At most *max_pending* files may be queued or in progress; submitting
+    more blocks until the oldest one is written.
+
+    .. automethod:: set_geometry
+    .. automethod:: submit
+    .. automethod:: flush
+    .. automethod:: close
+    """
+
+    def __init__(self, nworkers=1, max_pending=2):
+        import multiprocessing
+        import tempfile
+        from concurrent.futures import ProcessPoolExecutor
+        mp_context = multiprocessing.get_context("forkserver")
+        mp_context.set_forkserver_preload(["combozzle_viz"])
+        self._pool = ProcessPoolExecutor(max_workers=nworkers,
+                                         mp_context=mp_context)
+        self._max_pending = max_pending
+        self._pending = []
+        self._closed = False
+        self._geometry_dir = tempfile.mkdtemp(prefix="combozzle-viz-")
+        self._geometry_file = None
+        self._ngeometries = 0
+
+    def set_geometry(self, nodes, cells, cell_types):
+        """Use the VTK *nodes*, *cells* and *cell_types* for later files."""
+        self.flush()
+        geometry_file = os.path.join(self._geometry_dir,
+                                     f"geometry-{self._ngeometries}.npz")
+        np.savez(geometry_file, nodes=nodes, cells=cells, cell_types=cell_types)
+        self._ngeometries += 1
+        self._geometry_file = geometry_file
+
+    def submit(self, filename, names_and_fields, par_filename=None,
+               par_filenames=None):
+        """Queue host fields *names_and_fields* to be written to *filename*."""
+        if self._geometry_file is None:
+            raise RuntimeError("AsyncVisWriter.set_geometry was not called.")
+        while len(self._pending) >= self._max_pending:
+            self._pending.pop(0).result()
+        self._pending.append(self._pool.submit(
+            write_host_vtk_file, self._geometry_file, filename,
+            names_and_fields, par_filename, par_filenames))
+
+    def flush(self):
+        """Wait for all pending writes to finish."""
+        for future in self._pending:
+            future.result()
+        self._pending = []
+
+    def close(self):
+        """Finish all pending writes and shut down the pool."""
+        if not self._closed:
+            self._closed = True
+            self.flush()
+            self._pool.shutdown(wait=True)
+            import shutil
+            shutil.rmtree(self._geometry_dir, ignore_errors=True)
+
+
+def _get_element_subset_connections(actx, vol_discr, elements):
+    """Build a discretization on a subset of the elements of *vol_discr*.
+
+    *elements* holds one array of (group-local) element indices per group of
+    *vol_discr*. Returns a tuple *(sub_discr, restrict, prolong)*, where
+    *restrict* maps volume data onto *sub_discr*, and *prolong* maps it back,
+    zero-filled outside of the subset. Returns *None* if the subset is empty.
+    """
+    from meshmode.mesh import Mesh
+    from meshmode.discretization.connection import (
+        DirectDiscretizationConnection, DiscretizationConnectionElementGroup,
+        InterpolationBatch
+    )
+
+    mesh = vol_discr.mesh
+    group_indices = [igrp for igrp, els in enumerate(elements) if len(els)]
+    if not group_indices:
+        return None
+
+    sub_mesh = Mesh(
+        mesh.vertices,
+        [type(mesh.groups[igrp])(
+            order=mesh.groups[igrp].order,
+            vertex_indices=mesh.groups[igrp].vertex_indices[elements[igrp]],
+            nodes=mesh.groups[igrp].nodes[:, elements[igrp]],
+            unit_nodes=mesh.groups[igrp].unit_nodes,
+            dim=mesh.groups[igrp].dim)
+         for igrp in group_indices],
+        skip_tests=True)
+    sub_discr = vol_discr.copy(mesh=sub_mesh)
+
+    def make_batch(from_group_index, from_elements, to_elements, unit_nodes):
+        return DiscretizationConnectionElementGroup([InterpolationBatch(
+            from_group_index=from_group_index,
+            from_element_indices=actx.freeze(actx.from_numpy(from_elements)),
+            to_element_indices=actx.freeze(actx.from_numpy(to_elements)),
+            result_unit_nodes=unit_nodes,
+            to_element_face=None)])
+
+    sub_element_indices = [np.arange(len(elements[igrp]),
+                                     dtype=mesh.element_id_dtype)
+                           for igrp in group_indices]
+    restrict = DirectDiscretizationConnection(
+        vol_discr, sub_discr,
+        [make_batch(igrp, elements[igrp].astype(mesh.element_id_dtype),
+                    sub_els, vol_discr.groups[igrp].unit_nodes)
+         for igrp, sub_els in zip(group_indices, sub_element_indices)],
+        is_surjective=True)
+
+    prolong_groups = [DiscretizationConnectionElementGroup([])
+                      for _ in vol_discr.groups]
+    for isubgrp, (igrp, sub_els) in enumerate(zip(group_indices,
+                                                  sub_element_indices)):
+        prolong_groups[igrp] = make_batch(
+            isubgrp, sub_els, elements[igrp].astype(mesh.element_id_dtype),
+            vol_discr.groups[igrp].unit_nodes)
+    prolong = DirectDiscretizationConnection(
+        sub_discr, vol_discr, prolong_groups, is_surjective=False)
+
+    return sub_discr, restrict, prolong
+
+
+def _update_frozen_chemistry(step, state, chemistry_interval,
+                             compute_source):
+    """Re-evaluate the frozen chemistry source held in *state* if it is due.
+
+    With frozen chemistry, *state* is ``[cv, temperature_seed, source]``,
+    where *source* is held (with a zero RHS) between updates.  It is
+    re-evaluated by ``compute_source(cv, temperature_seed)`` at the steps
+    that are a multiple of *chemistry_interval*.
+    """
+    if step % chemistry_interval:
+        return state
+    from pytools.obj_array import make_obj_array
+    cv, tseed = state[0], state[1]
+    return make_obj_array([cv, tseed, compute_source(cv, tseed)])
+
+
+def _get_chemistry_rhs(state, chemistry_interval, get_source):
+    """Return the species source terms of the RHS at the (stage) *state*.
+
+    With a *chemistry_interval* greater than one, this is the frozen source
+    held in *state* (see :func:`_update_frozen_chemistry`).  Otherwise the
+    source is evaluated at every stage, by calling *get_source()*.
+    """
+    if chemistry_interval > 1:
+        return state[2]
+    return get_source()
+
+
 class InitSponge:
     r"""Solution initializer for flow in the ACT-II facility.
 
@@ -157,14 +1108,12 @@ class InitSponge:
         )
 
 
-@mpi_entry_point
-def main(ctx_factory=cl.create_some_context, use_logmgr=True,
-         use_leap=False, use_overintegration=False,
-         use_profiling=False, casename=None, lazy=False,
-         rst_filename=None, actx_class=PyOpenCLArrayContext,
-         log_dependent=False, input_file=None):
-    """Drive example."""
-    cl_ctx = ctx_factory()
+def run_case(actx, use_logmgr=True, use_leap=False,
+             use_overintegration=False, use_profiling=False, casename=None,
+             lazy=False, rst_filename=None, log_dependent=False,
+             input_file=None, compile_only=False):
+    """Run a single case with the (possibly shared) array context *actx*."""
+    queue = actx.queue
 
     if casename is None:
         casename = "mirgecom"
@@ -175,9 +1124,6 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
     nproc = comm.Get_size()
     nparts = nproc
 
-    from mirgecom.simutil import global_reduce as _global_reduce
-    global_reduce = partial(_global_reduce, comm=comm)
-
     # {{{ Some discretization parameters
 
     dim = 3
@@ -214,8 +1160,18 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
     # i.o frequencies
     nstatus = 100
     nviz = 100
+    async_viz = 0
+    viz_nworkers = 1
+    viz_max_pending = 2
+    viz_fields = None
     nhealth = 100
     nrestart = 1000
+    async_restart = 0
+    rhs_timers = 0
+    log_imbalance = 0
+    log_memory_pool = 0
+    restart_format = "pickle"
+    restart_compression = 0
     do_checkpoint = 0
     boundary_report = 0
     do_callbacks = 1
@@ -226,6 +1182,7 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
 
     dummy_rhs_only = 0
     timestepping_on = 1
+    compile_timestep = 0
     av_on = 1
     sponge_on = 1
     health_pres_min = 0.
@@ -247,9 +1204,24 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
     # {{{ Simulation control parameters
 
     grid_only = 0
+    distributed_mesh = 0
+    partition = "graph"
+    mesh_cache_dir = None
+    mesh_cache_max_gb = 10.
+    memory_check = "warn"  # pre-flight device memory check: off|warn|abort|shrink
+    memory_fraction = 0.9
+    memory_overhead = 3.
+    # Size-independent device memory per rank (CL context, compiled programs,
+    # caches). The smallest (384-element) 3d lazy grid_scale runs of the
+    # fusion actx use about 1.3 GB of memory_usage_gpu, while fits of
+    # memory_usage_gpu over element count give intercepts of 0.3 GB (2d
+    # fusion) to 1.35 GB (3d fusion), and 0.4 GB when the legacy actx runs
+    # are pooled in. Calibrate to the device and actx in use.
+    memory_baseline_gb = 1.25
     discr_only = 0
     inviscid_only = 0
     inert_only = 0
+    chemistry_interval = 1
     init_only = 0
     single_gas_only = 0
     nspecies = 7
@@ -339,6 +1311,38 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
             grid_only = int(input_data["grid_only"])
         except KeyError:
             pass
+        try:
+            distributed_mesh = int(input_data["distributed_mesh"])
+        except KeyError:
+            pass
+        try:
+            partition = input_data["partition"]
+        except KeyError:
+            pass
+        try:
+            mesh_cache_dir = input_data["mesh_cache_dir"]
+        except KeyError:
+            pass
+        try:
+            mesh_cache_max_gb = float(input_data["mesh_cache_max_gb"])
+        except KeyError:
+            pass
+        try:
+            memory_check = input_data["memory_check"]
+        except KeyError:
+            pass
+        try:
+            memory_fraction = float(input_data["memory_fraction"])
+        except KeyError:
+            pass
+        try:
+            memory_overhead = float(input_data["memory_overhead"])
+        except KeyError:
+            pass
+        try:
+            memory_baseline_gb = float(input_data["memory_baseline_gb"])
+        except KeyError:
+            pass
         try:
             discr_only = int(input_data["discr_only"])
         except KeyError:
@@ -351,6 +1355,10 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
             inert_only = int(input_data["inert_only"])
         except KeyError:
             pass
+        try:
+            chemistry_interval = int(input_data["chemistry_interval"])
+        except KeyError:
+            pass
         try:
             single_gas_only = int(input_data["single_gas_only"])
         except KeyError:
@@ -383,10 +1391,50 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
             nviz = int(input_data["nviz"])
         except KeyError:
             pass
+        try:
+            async_viz = int(input_data["async_viz"])
+        except KeyError:
+            pass
+        try:
+            viz_nworkers = int(input_data["viz_nworkers"])
+        except KeyError:
+            pass
+        try:
+            viz_max_pending = int(input_data["viz_max_pending"])
+        except KeyError:
+            pass
+        try:
+            viz_fields = input_data["viz_fields"]
+        except KeyError:
+            pass
         try:
             nrestart = int(input_data["nrestart"])
         except KeyError:
             pass
+        try:
+            async_restart = int(input_data["async_restart"])
+        except KeyError:
+            pass
+        try:
+            rhs_timers = int(input_data["rhs_timers"])
+        except KeyError:
+            pass
+        try:
+            log_imbalance = int(input_data["log_imbalance"])
+        except KeyError:
+            pass
+        try:
+            log_memory_pool = int(input_data["log_memory_pool"])
+        except KeyError:
+            pass
+        try:
+            restart_format = input_data["restart_format"]
+        except KeyError:
+            pass
+        try:
+            restart_compression = int(input_data["restart_compression"])
+        except KeyError:
+            pass
         try:
             nhealth = int(input_data["nhealth"])
         except KeyError:
@@ -399,6 +1447,10 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
             timestepping_on = int(input_data["timestepping_on"])
         except KeyError:
             pass
+        try:
+            compile_timestep = int(input_data["compile_timestep"])
+        except KeyError:
+            pass
         try:
             av_on = int(input_data["artificial_viscosity_on"])
         except KeyError:
@@ -477,6 +1529,28 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
             pass
 
     # param sanity check
+    allowed_restart_formats = ["pickle", "chunked"]
+    if restart_format not in allowed_restart_formats:
+        error_message = "Invalid restart format: {}".format(restart_format)
+        raise RuntimeError(error_message)
+
+    allowed_partitions = ["slab", "pencil", "block", "graph"]
+    if partition not in allowed_partitions:
+        error_message = "Invalid partition: {}".format(partition)
+        raise RuntimeError(error_message)
+
+    if viz_fields is not None and (
+            not isinstance(viz_fields, list)
+            or not all(isinstance(name, str) for name in viz_fields)):
+        error_message = "Invalid viz_fields (need a list of names): {}".format(
+            viz_fields)
+        raise RuntimeError(error_message)
+
+    allowed_memory_checks = ["off", "warn", "abort", "shrink"]
+    if memory_check not in allowed_memory_checks:
+        error_message = "Invalid memory check: {}".format(memory_check)
+        raise RuntimeError(error_message)
+
     allowed_integrators = ["rk4", "euler", "lsrk54", "lsrk144"]
     if integrator not in allowed_integrators:
         error_message = "Invalid time integrator: {}".format(integrator)
@@ -487,6 +1561,13 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
         print(f"\tCasename: {casename}")
         print("----- run control ------")
         print(f"\t{grid_only=},{discr_only=},{inert_only=}")
+        if not inert_only:
+            print(f"\t{chemistry_interval=}")
+        print(f"\t{distributed_mesh=}, {partition=}")
+        if mesh_cache_dir:
+            print(f"\t{mesh_cache_dir=}, {mesh_cache_max_gb=}")
+        print(f"\t{memory_check=}, {memory_fraction=}, {memory_overhead=}, "
+              f"{memory_baseline_gb=}")
         print(f"\t{single_gas_only=},{dummy_rhs_only=}")
         print(f"\t{periodic_boundary=},{adiabatic_boundary=}")
         print(f"\t{timestepping_on=}, {inviscid_only=}")
@@ -498,11 +1579,22 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
         print(f"\tt_final = {t_final}")
         print(f"\tconstant_cfl = {constant_cfl}")
         print(f"\tTime integration {integrator}")
+        print(f"\t{compile_timestep=}, {rhs_timers=}, {log_imbalance=}")
+        print(f"\t{log_memory_pool=}")
         if constant_cfl:
             print(f"\tcfl = {current_cfl}")
         print("---- i/o frequencies -----")
         print(f"\tnviz = {nviz}")
+        print(f"\tasync_viz = {async_viz}")
+        if async_viz:
+            print(f"\t{viz_nworkers=}, {viz_max_pending=}")
+        if viz_fields is not None:
+            print(f"\tviz_fields = {viz_fields}")
         print(f"\tnrestart = {nrestart}")
+        print(f"\tasync_restart = {async_restart}")
+        print(f"\trestart_format = {restart_format}")
+        if restart_format == "chunked":
+            print(f"\trestart_compression = {restart_compression}")
         print(f"\tnhealth = {nhealth}")
         print(f"\tnstatus = {nstatus}")
         print("----- domain ------")
@@ -541,40 +1633,45 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
     if integrator == "lsrk144":
         timestepper = lsrk144_step
 
-    xsize = domain_xlen*x_scale*weak_scale
-    ysize = domain_ylen*y_scale*weak_scale
-    zsize = domain_zlen*z_scale*weak_scale
-
-    ncx = int(xsize / chlen)
-    ncy = int(ysize / chlen)
-    ncz = int(zsize / chlen)
-
-    npts_x = ncx * n_refine + 1
-    npts_y = ncy * n_refine + 1
-    npts_z = ncz * n_refine + 1
-
-    x0 = xsize/2
-    y0 = ysize/2
-    z0 = zsize/2
-
-    xleft = x0 - xsize/2
-    xright = x0 + xsize/2
-    ybottom = y0 - ysize/2
-    ytop = y0 + ysize/2
-    zback = z0 - zsize/2
-    zfront = z0 + zsize/2
-
-    npts_axis = (npts_x,)
-    box_ll = (xleft,)
-    box_ur = (xright,)
-    if dim > 1:
-        npts_axis = (npts_x, npts_y)
-        box_ll = (xleft, ybottom)
-        box_ur = (xright, ytop)
-    if dim > 2:
-        npts_axis = (npts_x, npts_y, npts_z)
-        box_ll = (xleft, ybottom, zback)
-        box_ur = (xright, ytop, zfront)
+    def my_get_box(weak_scale):
+        xsize = domain_xlen*x_scale*weak_scale
+        ysize = domain_ylen*y_scale*weak_scale
+        zsize = domain_zlen*z_scale*weak_scale
+
+        ncx = int(xsize / chlen)
+        ncy = int(ysize / chlen)
+        ncz = int(zsize / chlen)
+
+        npts_x = ncx * n_refine + 1
+        npts_y = ncy * n_refine + 1
+        npts_z = ncz * n_refine + 1
+
+        x0 = xsize/2
+        y0 = ysize/2
+        z0 = zsize/2
+
+        xleft = x0 - xsize/2
+        xright = x0 + xsize/2
+        ybottom = y0 - ysize/2
+        ytop = y0 + ysize/2
+        zback = z0 - zsize/2
+        zfront = z0 + zsize/2
+
+        npts_axis = (npts_x,)
+        box_ll = (xleft,)
+        box_ur = (xright,)
+        if dim > 1:
+            npts_axis = (npts_x, npts_y)
+            box_ll = (xleft, ybottom)
+            box_ur = (xright, ytop)
+        if dim > 2:
+            npts_axis = (npts_x, npts_y, npts_z)
+            box_ll = (xleft, ybottom, zback)
+            box_ur = (xright, ytop, zfront)
+
+        return npts_axis, box_ll, box_ur
+
+    npts_axis, box_ll, box_ur = my_get_box(weak_scale)
 
     periodic = (periodic_boundary == 1,)*dim
     if rank == 0:
@@ -585,33 +1682,88 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
     if single_gas_only:
         inert_only = 1
 
+    # With frozen chemistry, the species source terms are carried along as a
+    # third state component (with zero RHS) and only re-evaluated every
+    # *chemistry_interval* steps
+    frozen_chemistry = not inert_only and chemistry_interval > 1
+
+    # {{{ Pre-flight device memory check
+
+    # Estimate the device memory before the (possibly lengthy) mesh
+    # generation and compilation, so that an oversized case fails (or is
+    # shrunk to fit) in seconds rather than running out of memory later
+    memory_estimate = None
+    if memory_check != "off":
+        if single_gas_only:
+            memory_nspecies = 0
+        elif inert_only:
+            memory_nspecies = nspecies
+        else:
+            from mirgecom.mechanisms.uiuc import Thermochemistry
+            memory_nspecies = Thermochemistry(np).num_species
+
+        def my_estimate_memory(npts_axis):
+            return _estimate_memory_footprint(
+                npts_axis, order, memory_nspecies, integrator, nparts,
+                use_overintegration=use_overintegration, av_on=av_on,
+                sponge_on=sponge_on, overhead=memory_overhead,
+                baseline=memory_baseline_gb*2**30)
+
+        memory_budget = memory_fraction*queue.device.global_mem_size
+        memory_estimate, memory_components = my_estimate_memory(npts_axis)
+        if rank == 0:
+            print(f"Estimated device memory per rank: "
+                  f"{memory_estimate/2**30:.2f} GiB of "
+                  f"{memory_budget/2**30:.2f} GiB available "
+                  + str({name: f"{nbytes/2**30:.2f} GiB"
+                         for name, nbytes in memory_components.items()}))
+
+        if memory_estimate > memory_budget:
+            error_message = (
+                f"Estimated device memory per rank "
+                f"({memory_estimate/2**30:.2f} GiB) exceeds the "
+                f"{memory_budget/2**30:.2f} GiB available")
+            if memory_check == "shrink" and not rst_filename:
+                while memory_estimate > memory_budget:
+                    weak_scale *= min(
+                        0.95, (memory_budget/memory_estimate)**(1/dim))
+                    npts_axis, box_ll, box_ur = my_get_box(weak_scale)
+                    if min(npts_axis) < 2:
+                        raise MyRuntimeError(
+                            f"{error_message}, even for the smallest mesh.")
+                    memory_estimate, _ = my_estimate_memory(npts_axis)
+                if rank == 0:
+                    print(f"{error_message}; reduced weak_scale to "
+                          f"{weak_scale:g} ({memory_estimate/2**30:.2f} GiB)\n"
+                          f"\tDomain: [{box_ll}, {box_ur}]\n"
+                          f"\tNpts/axis: {npts_axis}")
+            elif memory_check == "warn":
+                if rank == 0:
+                    print(f"WARNING: {error_message}.")
+            else:
+                raise MyRuntimeError(f"{error_message}.")
+
+    # }}}
+
     wall_temperature = init_temperature
     temperature_seed = init_temperature
     debug = False
 
-    if use_profiling:
-        queue = cl.CommandQueue(cl_ctx,
-            properties=cl.command_queue_properties.PROFILING_ENABLE)
-    else:
-        queue = cl.CommandQueue(cl_ctx)
-
-    if lazy:
-        actx = actx_class(comm, queue, mpi_base_tag=12000,
-                allocator=cl_tools.MemoryPool(cl_tools.ImmediateAllocator(queue)))
-    else:
-        actx = actx_class(comm, queue,
-                allocator=cl_tools.MemoryPool(cl_tools.ImmediateAllocator(queue)),
-                force_device_scalars=True)
-
     rst_path = "restart_data/"
     rst_pattern = (
         rst_path + "{cname}-{step:04d}-{rank:04d}.pkl"
     )
+    if restart_format == "chunked":
+        rst_pattern = rst_path + "{cname}-{step:04d}-{rank:04d}"
     if rst_filename:  # read the grid from restart data
-        rst_filename = f"{rst_filename}-{rank:04d}.pkl"
+        if os.path.isdir(f"{rst_filename}-{rank:04d}"):
+            rst_filename = f"{rst_filename}-{rank:04d}"
+            restart_data = _read_chunked_restart_data(rst_filename)
+        else:
+            rst_filename = f"{rst_filename}-{rank:04d}.pkl"
 
-        from mirgecom.restart import read_restart_data
-        restart_data = read_restart_data(actx, rst_filename)
+            from mirgecom.restart import read_restart_data
+            restart_data = read_restart_data(actx, rst_filename)
         local_mesh = restart_data["local_mesh"]
         local_nelements = local_mesh.nelements
         global_nelements = restart_data["global_nelements"]
@@ -620,14 +1772,66 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
         rst_step = restart_data["step"]
         rst_order = restart_data["order"]
     else:  # generate the grid from scratch
-        generate_mesh = partial(_get_box_mesh, dim, a=box_ll, b=box_ur, n=npts_axis,
-                                periodic=periodic)
-
-        local_mesh, global_nelements = generate_and_distribute_mesh(comm,
-                                                                    generate_mesh)
+        cached_mesh = None
+        if mesh_cache_dir:
+            mesh_params = {
+                "dim": dim, "npts_axis": tuple(npts_axis),
+                "box_ll": tuple(box_ll), "box_ur": tuple(box_ur),
+                "periodic": tuple(periodic), "nparts": nparts,
+                "distributed_mesh": distributed_mesh, "partition": partition
+            }
+            mesh_cache_key = _get_mesh_cache_key(**mesh_params)
+            from time import time
+            mesh_cache_start_time = time()
+            cached_mesh = _load_cached_mesh(comm, mesh_cache_dir, mesh_cache_key)
+            if rank == 0:
+                hit_or_miss = "hit" if cached_mesh else "miss"
+                print(f"Mesh cache {hit_or_miss}: {mesh_cache_key}")
+
+        # The distributed mesh is always split into blocks, so "graph" means
+        # "block" there
+        block_shape = None
+        if partition != "graph" or distributed_mesh:
+            max_split_axes = {"slab": 1, "pencil": 2}.get(partition)
+            block_shape = _get_box_block_shape([npts - 1 for npts in npts_axis],
+                                               nparts, max_split_axes)
+            if rank == 0:
+                print(f"Partition block shape: {block_shape}")
+
+        if cached_mesh is not None:
+            local_mesh, global_nelements = cached_mesh
+        elif distributed_mesh:  # each rank generates its own part of the grid
+            local_mesh, global_nelements = _get_distributed_box_mesh(
+                comm, dim, a=box_ll, b=box_ur, n=npts_axis, periodic=periodic,
+                block_shape=block_shape)
+        else:
+            generate_mesh = partial(_get_box_mesh, dim, a=box_ll, b=box_ur,
+                                    n=npts_axis, periodic=periodic)
+
+            if block_shape is None:
+                local_mesh, global_nelements = generate_and_distribute_mesh(
+                    comm, generate_mesh)
+            else:
+                local_mesh, global_nelements = _generate_and_distribute_box_mesh(
+                    comm, generate_mesh, a=box_ll, b=box_ur,
+                    ncells_axis=[npts - 1 for npts in npts_axis],
+                    block_shape=block_shape)
+
+        if mesh_cache_dir and cached_mesh is None:
+            _store_cached_mesh(comm, mesh_cache_dir, mesh_cache_key, local_mesh,
+                               global_nelements, mesh_params,
+                               max_nbytes=mesh_cache_max_gb*2**30,
+                               run_start_time=mesh_cache_start_time)
         local_nelements = local_mesh.nelements
 
+    # Not all of the mesh setups provide the global element count on all ranks
+    global_nelements = comm.bcast(global_nelements, root=0)
+    element_imbalance = (comm.allreduce(local_nelements, op=MPI.MAX)
+                         / (global_nelements / nparts))
+
     print(f"{rank=},{dim=},{order=},{local_nelements=},{global_nelements=}")
+    if rank == 0:
+        print(f"Element imbalance (max/mean): {element_imbalance:.4f}")
     if grid_only:
         return 0
 
@@ -679,6 +1883,11 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
         return 0
 
     vis_timer = None
+    restart_timer = None
+    rhs_phase_timers = {}
+    rhs_phase_allocs = {}
+    reduce_timer = None
+    memory_pool = getattr(actx, "allocator", None)
 
     casename = f"{casename}-d{dim}p{order}e{global_nelements}n{nparts}"
 
@@ -692,6 +1901,64 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
         vis_timer = IntervalTimer("t_vis", "Time spent visualizing")
         logmgr.add_quantity(vis_timer)
 
+        restart_timer = IntervalTimer("t_restart",
+                                      "Time spent snapshotting restart data")
+        logmgr.add_quantity(restart_timer)
+        if async_restart:
+            restart_write_timer = IntervalTimer(
+                "t_restart_write", "Time spent writing restart data in the "
+                "background")
+            logmgr.add_quantity(restart_write_timer)
+
+        logmgr.set_constant("local_nelements", local_nelements)
+        logmgr.set_constant("element_imbalance", element_imbalance)
+        if memory_estimate is not None:
+            logmgr.set_constant("memory_estimate", memory_estimate)
+
+        if log_imbalance:
+            step_compute_timer = IntervalTimer(
+                "t_step_compute", "Time spent computing the step (to completion)")
+            logmgr.add_quantity(step_compute_timer)
+            mpi_wait_timer = IntervalTimer(
+                "t_mpi_wait", "Time spent waiting for the other ranks after the "
+                "step")
+            logmgr.add_quantity(mpi_wait_timer)
+            reduce_timer = IntervalTimer(
+                "t_reduce", "Time spent in health/status reductions")
+            logmgr.add_quantity(reduce_timer)
+            log_step_imbalance = LogUserQuantity(
+                name="step_imbalance", value=1.0,
+                description="Max/mean step compute time over the ranks")
+            logmgr.add_quantity(log_step_imbalance)
+
+        if rhs_timers:
+            for phase, description in [
+                    ("fluid_state", "making the fluid state"),
+                    ("operator_states", "making the operator fluid states"),
+                    ("grad_cv", "computing the CV gradient"),
+                    ("fluid_operator", "applying the NS/Euler operator"),
+                    ("chemistry", "computing species source terms"),
+                    ("av", "computing artificial viscosity"),
+                    ("sponge", "applying the sponge")]:
+                rhs_phase_timers[phase] = IntervalTimer(
+                    f"t_rhs_{phase}", f"Time spent in the RHS {description}")
+                logmgr.add_quantity(rhs_phase_timers[phase])
+
+        if log_memory_pool and isinstance(memory_pool, CountingAllocator):
+            logmgr.add_quantity(MemoryPoolTelemetry(memory_pool))
+            logmgr.add_watches([
+                ("pool_misses.max",
+                 "\n------- pool misses/allocs = {value:g}/"),
+                ("pool_allocs.max", "{value:g}\n")])
+            # In lazy mode, the phases only allocate their results if they
+            # are evaluated separately (rhs_timers = 2)
+            for phase in rhs_phase_timers:
+                rhs_phase_allocs[phase] = AllocationCounter(
+                    f"pool_allocs_rhs_{phase}",
+                    f"Allocations from the memory pool in the RHS {phase} "
+                    "phase")
+                logmgr.add_quantity(rhs_phase_allocs[phase])
+
         logmgr.add_watches([
             ("step.max", "step = {value}, "),
             ("t_sim.max", "sim time: {value:1.6e} s\n"),
@@ -804,14 +2071,12 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
 
     from pytools.obj_array import make_obj_array
 
-    if inert_only:
-        compute_temperature_update = None
-    else:
+    if inert_only == 0:
+        # compiled as part of the state reductions (see my_get_state_stats)
         def get_temperature_update(cv, temperature):
             y = cv.species_mass_fractions
             e = gas_model.eos.internal_energy(cv) / cv.mass
             return pyro_mechanism.get_temperature_update_energy(e, temperature, y)
-        compute_temperature_update = actx.compile(get_temperature_update)
 
     from mirgecom.gas_model import make_fluid_state
 
@@ -821,6 +2086,20 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
 
     construct_fluid_state = actx.compile(get_fluid_state)
 
+    if frozen_chemistry:
+        def get_chemistry_source(cv, tseed):
+            fluid_state = make_fluid_state(cv=cv, gas_model=gas_model,
+                                           temperature_seed=tseed)
+            return eos.get_species_source_terms(cv, fluid_state.temperature)
+
+        compute_chemistry_source = actx.compile(get_chemistry_source)
+
+    def my_update_chemistry(step, state):
+        if not frozen_chemistry:
+            return state
+        return _update_frozen_chemistry(step, state, chemistry_interval,
+                                        compute_chemistry_source)
+
     # }}}
 
     # {{{ MIRGE-Com state initialization
@@ -867,18 +2146,34 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
         if logmgr:
             from mirgecom.logging_quantities import logmgr_set_time
             logmgr_set_time(logmgr, current_step, current_t)
+
+        def get_restart_field(name, rst_discr):
+            # asynchronously written restarts hold flattened host arrays
+            field = restart_data[name]
+            if restart_data.get("flattened", False):
+                from arraycontext import unflatten
+                rst_nodes = thaw(rst_discr.nodes(), actx)
+                if name == "cv":
+                    template = initializer(eos=gas_model.eos, x_vec=rst_nodes)
+                else:
+                    template = rst_discr.zeros(actx)
+                field = unflatten(template, actx.from_numpy(np.asarray(field)),
+                                  actx, strict=False)
+            return field
+
         if order == rst_order:
-            current_cv = restart_data["cv"]
-            temperature_seed = restart_data["temperature_seed"]
+            current_cv = get_restart_field("cv", discr)
+            temperature_seed = get_restart_field("temperature_seed", discr)
         else:
-            rst_cv = restart_data["cv"]
             old_discr = EagerDGDiscretization(actx, local_mesh, order=rst_order,
                                               mpi_communicator=comm)
+            rst_cv = get_restart_field("cv", old_discr)
             from meshmode.discretization.connection import make_same_mesh_connection
             connection = make_same_mesh_connection(actx, discr.discr_from_dd("vol"),
                                                    old_discr.discr_from_dd("vol"))
             current_cv = connection(rst_cv)
-            temperature_seed = connection(restart_data["temperature_seed"])
+            temperature_seed = connection(
+                get_restart_field("temperature_seed", old_discr))
     else:
         # Set the current state from time 0
         current_cv = initializer(eos=gas_model.eos, x_vec=nodes)
@@ -893,13 +2188,35 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
     temperature_seed = current_dv.temperature
 
     if sponge_on:
-        sponge_sigma = InitSponge(x0=sponge_x0, thickness=sponge_thickness,
-                                 amplitude=sponge_amp)(x_vec=nodes)
-        sponge_ref_cv = initializer(eos=gas_model.eos, x_vec=nodes)
+        # The sponge data only live on the elements that reach into the
+        # sponge zone (x > x0), the forcing is prolonged back to the volume
+        sponge_elements = [
+            np.where(np.max(actx.to_numpy(xgrp), axis=1) > sponge_x0)[0]
+            for xgrp in nodes[0]]
+        nsponge_elements = comm.allreduce(
+            sum(len(els) for els in sponge_elements))
+        if rank == 0:
+            print(f"Sponge elements: {nsponge_elements}/{global_nelements}")
 
-        # sponge function
-        def _sponge(cv):
-            return sponge_sigma*(sponge_ref_cv - cv)
+        sponge_conns = _get_element_subset_connections(
+            actx, discr.discr_from_dd("vol"), sponge_elements)
+
+        if sponge_conns is None:
+            def _sponge(cv):
+                return 0*cv
+        else:
+            sponge_discr, sponge_restrict, sponge_prolong = sponge_conns
+            sponge_nodes = thaw(sponge_discr.nodes(), actx)
+            sponge_sigma = InitSponge(x0=sponge_x0, thickness=sponge_thickness,
+                                     amplitude=sponge_amp)(x_vec=sponge_nodes)
+            sponge_ref_cv = initializer(eos=gas_model.eos, x_vec=sponge_nodes)
+
+            # sponge function
+            def _sponge(cv):
+                from meshmode.dof_array import rec_map_dof_array_container
+                sponge_cv = rec_map_dof_array_container(sponge_restrict, cv)
+                return rec_map_dof_array_container(
+                    sponge_prolong, sponge_sigma*(sponge_ref_cv - sponge_cv))
 
     # Inspection at physics debugging time
     if debug:
@@ -910,6 +2227,27 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
     # }}}
 
     visualizer = make_visualizer(discr)
+
+    # meshmode has no public accessor for the VTK cell connectivity; the
+    # private one has been a (cached) property with cells and cell_types
+    # since meshmode 2020.2
+    vtk_connectivity = getattr(visualizer, "_vtk_connectivity", None)
+    vis_writer = None
+    if async_viz and vtk_connectivity is None:
+        if rank == 0:
+            logger.warning("Asynchronous visualization is unavailable "
+                           "(no VTK connectivity), writing synchronously.")
+    elif async_viz:
+        vis_writer = AsyncVisWriter(nworkers=viz_nworkers,
+                                    max_pending=viz_max_pending)
+        import atexit
+        atexit.register(vis_writer.close)
+        from arraycontext import flatten
+        vis_nodes = np.zeros((3, visualizer.vis_discr.ndofs))
+        for idim, ary in enumerate(thaw(visualizer.vis_discr.nodes(), actx)):
+            vis_nodes[idim] = actx.to_numpy(flatten(ary, actx))
+        vis_writer.set_geometry(vis_nodes, vtk_connectivity.cells,
+                                vtk_connectivity.cell_types)
     initname = initializer.__class__.__name__
     eosname = gas_model.eos.__class__.__name__
     init_message = make_init_message(dim=dim, order=order,
@@ -935,22 +2273,63 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
                         f" {eq_pressure=}, {eq_temperature=},"
                         f" {eq_density=}, {eq_mass_fractions=}")
 
-    def my_write_status(dt, cfl, dv=None):
+    def get_state_reductions(cv, dv):
+        """Stack all local health and status reductions into one array.
+
+        The entries are: NaN/Inf indicators for pressure and temperature (0
+        if all values are finite, NaN otherwise), the negated pressure min,
+        pressure max, negated temperature min, temperature max, and (for
+        reactive mixtures) the temperature residual max.  Negating the
+        minima makes MAX the only reduction needed across ranks.
+        """
+        from grudge.op import nodal_min_loc, nodal_max_loc, nodal_sum_loc
+        pressure = dv.pressure
+        temperature = dv.temperature
+        reductions = [
+            nodal_sum_loc(discr, "vol", 0*pressure),
+            nodal_sum_loc(discr, "vol", 0*temperature),
+            -nodal_min_loc(discr, "vol", pressure),
+            nodal_max_loc(discr, "vol", pressure),
+            -nodal_min_loc(discr, "vol", temperature),
+            nodal_max_loc(discr, "vol", temperature)
+        ]
+        if inert_only == 0:
+            temp_resid = get_temperature_update(cv, temperature) / temperature
+            reductions.append(nodal_max_loc(discr, "vol", temp_resid))
+        return actx.np.stack(reductions)
+
+    compute_state_reductions = actx.compile(get_state_reductions)
+
+    def my_get_state_stats(cv, dv):
+        """Get health and status data with one transfer and one allreduce."""
+        local_vals = actx.to_numpy(compute_state_reductions(cv, dv))
+        # turn the NaN/Inf indicators into flags so that MAX acts as an OR
+        local_vals[:2] = np.where(np.isfinite(local_vals[:2]), 0., 1.)
+        global_vals = np.empty_like(local_vals)
+        from contextlib import nullcontext
+        with (reduce_timer.start_sub_timer() if reduce_timer else nullcontext()):
+            comm.Allreduce(local_vals, global_vals, op=MPI.MAX)
+
+        stats = {
+            "local_pressure_naninf": bool(local_vals[0]),
+            "local_temperature_naninf": bool(local_vals[1]),
+            "pressure_naninf": bool(global_vals[0]),
+            "temperature_naninf": bool(global_vals[1]),
+            "pmin": -global_vals[2],
+            "pmax": global_vals[3],
+            "tmin": -global_vals[4],
+            "tmax": global_vals[5]
+        }
+        if inert_only == 0:
+            stats["local_temp_err"] = local_vals[6]
+            stats["temp_err"] = global_vals[6]
+        return stats
+
+    def my_write_status(dt, cfl, stats=None):
         status_msg = f"------ {dt=}" if constant_cfl else f"----- {cfl=}"
-        if ((dv is not None) and (not log_dependent)):
-
-            temp = dv.temperature
-            press = dv.pressure
-
-            from grudge.op import nodal_min_loc, nodal_max_loc
-            tmin = global_reduce(actx.to_numpy(nodal_min_loc(discr, "vol", temp)),
-                                 op="min")
-            tmax = global_reduce(actx.to_numpy(nodal_max_loc(discr, "vol", temp)),
-                                 op="max")
-            pmin = global_reduce(actx.to_numpy(nodal_min_loc(discr, "vol", press)),
-                                 op="min")
-            pmax = global_reduce(actx.to_numpy(nodal_max_loc(discr, "vol", press)),
-                                 op="max")
+        if ((stats is not None) and (not log_dependent)):
+            pmin, pmax = stats["pmin"], stats["pmax"]
+            tmin, tmax = stats["tmin"], stats["tmax"]
             dv_status_msg = f"\nP({pmin}, {pmax}), T({tmin}, {tmax})"
             status_msg = status_msg + dv_status_msg
 
@@ -958,15 +2337,103 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
             logger.info(status_msg)
 
     def my_write_viz(step, t, cv, dv):
-        viz_fields = [("cv", cv), ("dv", dv)]
-        write_visfile(discr, viz_fields, visualizer, vizname=casename,
-                      step=step, t=t, overwrite=True, vis_timer=vis_timer)
+        names_and_fields = _select_viz_fields([("cv", cv), ("dv", dv)], dim,
+                                              viz_fields)
+        if vis_writer is None:
+            write_visfile(discr, names_and_fields, visualizer, vizname=casename,
+                          step=step, t=t, overwrite=True, vis_timer=vis_timer)
+            return
+
+        # Pull all of the (resampled) fields to the host in one transfer and
+        # leave the file writing to the pool
+        from arraycontext import flatten
+        from contextlib import nullcontext
+        with (vis_timer.start_sub_timer() if vis_timer else nullcontext()):
+            components = [comp
+                          for _, field in names_and_fields
+                          for comp in (field if isinstance(field, np.ndarray)
+                                       else [field])]
+            host_data = actx.to_numpy(actx.np.concatenate([
+                flatten(visualizer.connection(comp), actx)
+                for comp in components])).reshape(len(components), -1)
+
+            host_fields = []
+            icomp = 0
+            for name, field in names_and_fields:
+                if isinstance(field, np.ndarray):
+                    vec = np.zeros((3, host_data.shape[1]))
+                    vec[:len(field)] = host_data[icomp:icomp+len(field)]
+                    host_fields.append((name, vec))
+                    icomp += len(field)
+                else:
+                    host_fields.append((name, host_data[icomp]))
+                    icomp += 1
+
+            # the same file names as write_visfile
+            rank_fname = make_rank_fname(basename=casename, step=step, t=t)
+            filename = rank_fname.format(rank=rank)
+            par_filename = None
+            par_filenames = None
+            if rank == 0:
+                par_filename = make_par_fname(basename=casename, step=step, t=t)
+                par_filenames = [rank_fname.format(rank=irank)
+                                 for irank in range(nparts)]
+            vis_writer.submit(filename, host_fields, par_filename, par_filenames)
+
+    write_host_restart = _write_host_restart_file
+    if restart_format == "chunked":
+        write_host_restart = partial(_write_chunked_restart_file,
+                                     compress=bool(restart_compression))
+    rst_mesh_name = f"{casename}-mesh-{rank:04d}"
+    rst_mesh_written = False
+    if rst_filename and "mesh" in restart_data:
+        # The mesh of a chunked restart is memory-mapped from its directory;
+        # new restarts next to it refer to it instead of writing over it
+        rst_dir = os.path.dirname(os.path.normpath(rst_filename))
+        if os.path.realpath(rst_dir) == os.path.realpath(rst_path):
+            rst_mesh_name = restart_data["mesh"]
+            rst_mesh_written = True
+
+    restart_writer = None
+    if async_restart:
+        restart_writer = AsyncRestartWriter(write_func=write_host_restart)
+        import atexit
+        atexit.register(restart_writer.close)
 
     def my_write_restart(step, t, state, temperature_seed):
+        nonlocal rst_mesh_written
+        from contextlib import nullcontext
+        rst_timing = (restart_timer.start_sub_timer() if restart_timer
+                      else nullcontext())
         rst_fname = rst_pattern.format(cname=casename, step=step, rank=rank)
         if rst_fname == rst_filename:
             if rank == 0:
                 logger.info("Skipping overwrite of restart file.")
+        elif restart_writer is not None or restart_format == "chunked":
+            from arraycontext import flatten
+            with rst_timing:
+                rst_data = {
+                    "local_mesh": local_mesh,
+                    "cv": actx.to_numpy(flatten(state.cv, actx)),
+                    "temperature_seed": actx.to_numpy(
+                        flatten(temperature_seed, actx)),
+                    "flattened": True,
+                    "t": t,
+                    "step": step,
+                    "order": order,
+                    "global_nelements": global_nelements,
+                    "num_parts": nproc
+                }
+                if restart_format == "chunked":
+                    # the mesh is written with the first restart only
+                    rst_data["mesh"] = rst_mesh_name
+                    if rst_mesh_written:
+                        del rst_data["local_mesh"]
+                    rst_mesh_written = True
+                if restart_writer is not None:
+                    restart_writer.submit(rst_data, rst_fname)
+                else:
+                    write_host_restart(rst_data, rst_fname)
         else:
             rst_data = {
                 "local_mesh": local_mesh,
@@ -979,31 +2446,27 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
                 "num_parts": nproc
             }
             from mirgecom.restart import write_restart_file
-            write_restart_file(actx, rst_data, rst_fname, comm)
+            with rst_timing:
+                write_restart_file(actx, rst_data, rst_fname, comm)
 
-    def my_health_check(cv, dv):
-        import grudge.op as op
+    def my_health_check(stats):
         health_error = False
 
-        pressure = dv.pressure
-        temperature = dv.temperature
-
-        from mirgecom.simutil import check_naninf_local
-        if check_naninf_local(discr, "vol", pressure):
-            health_error = True
+        if stats["local_pressure_naninf"]:
             logger.info(f"{rank=}: Invalid pressure data found.")
-
-        if check_naninf_local(discr, "vol", temperature):
-            health_error = True
+        if stats["local_temperature_naninf"]:
             logger.info(f"{rank=}: Invalid temperature data found.")
+        if stats["pressure_naninf"] or stats["temperature_naninf"]:
+            health_error = True
 
         if inert_only == 0:
             # This check is the temperature convergence check
-            temp_resid = compute_temperature_update(cv, temperature) / temperature
-            temp_err = (actx.to_numpy(op.nodal_max_loc(discr, "vol", temp_resid)))
-            if temp_err > 1e-8:
+            local_temp_err = stats["local_temp_err"]
+            if local_temp_err > 1e-8:
+                logger.info(f"{rank=}: Temperature is not converged "
+                            f"{local_temp_err=}.")
+            if stats["temp_err"] > 1e-8:
                 health_error = True
-                logger.info(f"{rank=}: Temperature is not converged {temp_resid=}.")
 
         return health_error
 
@@ -1017,7 +2480,8 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
         return alpha_sc*state.speed*length_scales
 
     def my_pre_step(step, t, dt, state):
-        cv, tseed = state
+        state = my_update_chemistry(step, state)
+        cv, tseed = state[0], state[1]
         fluid_state = construct_fluid_state(cv, tseed)
         dv = fluid_state.dv
 
@@ -1028,6 +2492,9 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
 
             if logmgr:
                 logmgr.tick_before()
+                if restart_writer is not None:
+                    for write_time in restart_writer.pop_write_times():
+                        restart_write_timer.add_time(write_time)
 
             if do_checkpoint:
                 from mirgecom.simutil import check_step
@@ -1036,15 +2503,19 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
                 do_health = check_step(step=step, interval=nhealth)
                 do_status = check_step(step=step, interval=nstatus)
 
+                stats = None
+                if do_health or do_status:
+                    stats = my_get_state_stats(cv, dv)
+
                 if do_health:
-                    health_errors = global_reduce(my_health_check(cv, dv), op="lor")
+                    health_errors = my_health_check(stats)
                     if health_errors:
                         if rank == 0:
                             logger.info("Fluid solution failed health check.")
                         raise MyRuntimeError("Failed simulation health check.")
 
                 if do_status:
-                    my_write_status(dt=dt, cfl=current_cfl, dv=dv)
+                    my_write_status(dt=dt, cfl=current_cfl, stats=stats)
 
                 if do_restart:
                     my_write_restart(step=step, t=t, state=fluid_state,
@@ -1061,7 +2532,7 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
         return state, dt
 
     def my_post_step(step, t, dt, state):
-        cv, tseed = state
+        cv = state[0]
 
         # Logmgr needs to know about EOS, dt, dim?
         # imo this is a design/scope flaw
@@ -1078,7 +2549,7 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
     def dummy_pre_step(step, t, dt, state):
         if logmgr:
             logmgr.tick_before()
-        return state, dt
+        return my_update_chemistry(step, state), dt
 
     def dummy_post_step(step, t, dt, state):
         if logmgr:
@@ -1094,69 +2565,112 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
         post_step_func = my_post_step
 
     from mirgecom.flux import num_flux_central
+    from grudge.trace_pair import TracePair
+    from arraycontext import is_array_container_type
     from mirgecom.gas_model import make_operator_fluid_states
     from mirgecom.navierstokes import grad_cv_operator
 
+    def my_sync_rhs_phase(result):
+        """Force the evaluation of the RHS phase *result*."""
+        if isinstance(result, (tuple, list)):
+            return type(result)(my_sync_rhs_phase(item) for item in result)
+        if isinstance(result, TracePair):
+            return TracePair(result.dd,
+                             interior=my_sync_rhs_phase(result.int),
+                             exterior=my_sync_rhs_phase(result.ext))
+        if lazy and is_array_container_type(type(result)):
+            return thaw(actx.freeze(result), actx)
+        return result
+
+    def my_rhs_phase(phase, func, *args, **kwargs):
+        """Call *func*, timing it with the RHS phase timer for *phase*.
+
+        With *rhs_timers* = 2, the phase is synchronized with the device
+        (in lazy mode, by evaluating its result) before the timer stops.
+        """
+        timer = rhs_phase_timers.get(phase)
+        if timer is None:
+            return func(*args, **kwargs)
+
+        alloc_counter = rhs_phase_allocs.get(phase)
+        if alloc_counter is not None:
+            nallocs = memory_pool.nallocs
+        with timer.start_sub_timer():
+            result = func(*args, **kwargs)
+            if rhs_timers > 1:
+                result = my_sync_rhs_phase(result)
+                actx.queue.finish()
+        if alloc_counter is not None:
+            alloc_counter.count += memory_pool.nallocs - nallocs
+        return result
+
     def cfd_rhs(t, state):
-        cv, tseed = state
-        from mirgecom.gas_model import make_fluid_state
-        fluid_state = make_fluid_state(cv=cv, gas_model=gas_model,
-                                       temperature_seed=tseed)
-        fluid_operator_states = make_operator_fluid_states(discr, fluid_state,
-                                                           gas_model, boundaries,
-                                                           quadrature_tag)
+        tseed = state[1]
+        fluid_state = my_rhs_phase("fluid_state", get_fluid_state, state[0], tseed)
+        cv = fluid_state.cv
+        fluid_operator_states = my_rhs_phase(
+            "operator_states", make_operator_fluid_states, discr, fluid_state,
+            gas_model, boundaries, quadrature_tag)
 
         if inviscid_only:
-            fluid_rhs = \
-                euler_operator(
-                    discr, state=fluid_state, time=t,
-                    boundaries=boundaries, gas_model=gas_model,
-                    inviscid_numerical_flux_func=inviscid_facial_flux_rusanov,
-                    quadrature_tag=quadrature_tag,
-                    operator_states_quad=fluid_operator_states)
+            fluid_rhs = my_rhs_phase(
+                "fluid_operator", euler_operator,
+                discr, state=fluid_state, time=t,
+                boundaries=boundaries, gas_model=gas_model,
+                inviscid_numerical_flux_func=inviscid_facial_flux_rusanov,
+                quadrature_tag=quadrature_tag,
+                operator_states_quad=fluid_operator_states)
         else:
-            grad_cv = grad_cv_operator(discr, gas_model, boundaries, fluid_state,
-                                       time=t,
-                                       numerical_flux_func=num_flux_central,
-                                       quadrature_tag=quadrature_tag,
-                                       operator_states_quad=fluid_operator_states)
-            fluid_rhs = \
-                ns_operator(
-                    discr, state=fluid_state, time=t, boundaries=boundaries,
-                    gas_model=gas_model, quadrature_tag=quadrature_tag,
-                    inviscid_numerical_flux_func=inviscid_facial_flux_rusanov)
+            grad_cv = my_rhs_phase(
+                "grad_cv", grad_cv_operator,
+                discr, gas_model, boundaries, fluid_state, time=t,
+                numerical_flux_func=num_flux_central,
+                quadrature_tag=quadrature_tag,
+                operator_states_quad=fluid_operator_states)
+            fluid_rhs = my_rhs_phase(
+                "fluid_operator", ns_operator,
+                discr, state=fluid_state, time=t, boundaries=boundaries,
+                gas_model=gas_model, quadrature_tag=quadrature_tag,
+                inviscid_numerical_flux_func=inviscid_facial_flux_rusanov)
 
         if inert_only:
             chem_rhs = 0*fluid_rhs
         else:
-            chem_rhs = eos.get_species_source_terms(cv, fluid_state.temperature)
+            chem_rhs = _get_chemistry_rhs(
+                state, chemistry_interval,
+                lambda: my_rhs_phase("chemistry", eos.get_species_source_terms,
+                                     cv, fluid_state.temperature))
 
         if av_on:
-            alpha_f = compute_av_alpha_field(fluid_state)
-            indicator = smoothness_indicator(discr, fluid_state.mass_density,
-                                             kappa=kappa_sc, s0=s0_sc)
-            av_rhs = av_laplacian_operator(
-                discr, fluid_state=fluid_state, boundaries=boundaries, time=t,
-                gas_model=gas_model, grad_cv=grad_cv,
-                operator_states_quad=fluid_operator_states,
-                alpha=alpha_f, s0=s0_sc, kappa=kappa_sc,
-                indicator=indicator)
+            def get_av_rhs():
+                alpha_f = compute_av_alpha_field(fluid_state)
+                indicator = smoothness_indicator(discr, fluid_state.mass_density,
+                                                 kappa=kappa_sc, s0=s0_sc)
+                return av_laplacian_operator(
+                    discr, fluid_state=fluid_state, boundaries=boundaries,
+                    time=t, gas_model=gas_model, grad_cv=grad_cv,
+                    operator_states_quad=fluid_operator_states,
+                    alpha=alpha_f, s0=s0_sc, kappa=kappa_sc,
+                    indicator=indicator)
+
+            av_rhs = my_rhs_phase("av", get_av_rhs)
         else:
             av_rhs = 0*fluid_rhs
 
         if sponge_on:
-            sponge_rhs = _sponge(fluid_state.cv)
+            sponge_rhs = my_rhs_phase("sponge", _sponge, fluid_state.cv)
         else:
             sponge_rhs = 0*fluid_rhs
 
         fluid_rhs = fluid_rhs + chem_rhs + av_rhs + sponge_rhs
         tseed_rhs = fluid_state.temperature - tseed
 
+        if frozen_chemistry:
+            return make_obj_array([fluid_rhs, tseed_rhs, 0*state[2]])
         return make_obj_array([fluid_rhs, tseed_rhs])
 
     def dummy_rhs(t, state):
-        cv, tseed = state
-        return make_obj_array([0*cv, 0*tseed])
+        return make_obj_array([0*comp for comp in state])
 
     if dummy_rhs_only:
         my_rhs = dummy_rhs
@@ -1167,6 +2681,115 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
                                   current_cfl, t_final, constant_cfl)
 
     current_state = make_obj_array([current_cv, temperature_seed])
+    if frozen_chemistry:
+        current_state = make_obj_array([
+            current_cv, temperature_seed,
+            compute_chemistry_source(current_cv, temperature_seed)])
+
+    def make_compiled_timestepper(step_rhs):
+        # Trace all stages of one step (RHS evaluations and stage updates)
+        # into a single program
+        def get_stepped_state(state, t, dt):
+            return timestepper(state=state, t=t, dt=dt, rhs=step_rhs)
+
+        compiled_step = actx.compile(get_stepped_state)
+
+        def compiled_timestepper(state, t, dt, rhs):
+            # *rhs* is step_rhs, which is already part of the compiled step
+            return compiled_step(state, t, dt)
+
+        return compiled_timestepper
+
+    global_ndofs = comm.allreduce(discr.discr_from_dd("vol").ndofs)
+    if logmgr:
+        # Normalized throughput, based on the number of RHS evaluations
+        # (stages) per step of the integrator
+        nstages = {"euler": 1, "rk4": 4, "lsrk54": 5, "lsrk144": 14}[integrator]
+        nvars = dim + 2 + nspecies
+        logmgr.add_quantity(StepThroughput(
+            "dofs_per_s", global_ndofs*nvars*nstages, "1/s",
+            "Conserved-variable DOFs processed by the RHS per second"))
+        logmgr.add_quantity(StepThroughput(
+            "rhs_per_s", nstages, "1/s", "RHS evaluations per second"))
+        logmgr.add_quantity(StepThroughput(
+            "elsteps_per_s", global_nelements, "1/s",
+            "Element steps per second"))
+        logmgr.add_watches([
+            ("dofs_per_s.min", "\n------- throughput: {value:1.4e} DOFs/s, "),
+            ("rhs_per_s.min", "{value:6g} RHS/s")
+        ])
+        # Cost model inputs that are not in the log filename
+        logmgr.set_constant("nspecies", nspecies)
+        logmgr.set_constant("lazy", lazy)
+        logmgr.set_constant("global_ndofs", global_ndofs)
+
+    my_timestepper = timestepper
+    if rhs_timers:
+        # The phases of the RHS can only be timed separately if the RHS is
+        # not compiled into a single program, so bypass the RHS that
+        # advance_state compiles (and ignore compile_timestep)
+        def uncompiled_rhs_timestepper(state, t, dt, rhs):
+            return timestepper(state=state, t=t, dt=dt, rhs=my_rhs)
+
+        my_timestepper = uncompiled_rhs_timestepper
+    elif compile_timestep:
+        my_timestepper = make_compiled_timestepper(my_rhs)
+
+    from time import perf_counter
+
+    if compile_only:
+        # Trace and compile everything the timestepping loop would, so that
+        # the kernel caches are warm for subsequent (timed) runs.
+        if rank == 0:
+            logger.info("Compile-only: building kernels without timestepping.")
+        compile_start = perf_counter()
+
+        # Take one step the way advance_state does, with the compiled RHS.
+        # Evaluating the stepped state also compiles the stage updates,
+        # which (in lazy mode, unless compile_timestep traces them into the
+        # step) are programs of their own. The step is taken before the
+        # imbalance timing is wrapped around it, which would synchronize
+        # the ranks.
+        compiled_rhs = actx.compile(my_rhs)
+        actx.freeze(my_timestepper(current_state, current_t, current_dt,
+                                   compiled_rhs))
+        my_get_state_stats(current_cv, current_dv)
+        actx.queue.finish()
+
+        compile_time = perf_counter() - compile_start
+        if rank == 0:
+            logger.info(f"Compile-only: done in {compile_time:.3f}s.")
+        if logmgr:
+            logmgr.close()
+        return 0
+
+    if logmgr and log_imbalance:
+        # Complete each step before it is timed, and separate the time spent
+        # waiting for slower ranks (which otherwise shows up in the halo
+        # exchanges of the next step) from the compute time
+        balanced_timestepper = my_timestepper
+
+        def imbalance_timestepper(state, t, dt, rhs):
+            step_start = perf_counter()
+            state = balanced_timestepper(state, t, dt, rhs)
+            if lazy:
+                # An uncompiled step only builds the expression of the new
+                # state; evaluate it so that its compute time is measured
+                state = thaw(actx.freeze(state), actx)
+            actx.queue.finish()
+            step_compute_time = perf_counter() - step_start
+            step_compute_timer.add_time(step_compute_time)
+
+            with mpi_wait_timer.start_sub_timer():
+                comm.Barrier()
+
+            max_time = comm.allreduce(step_compute_time, op=MPI.MAX)
+            sum_time = comm.allreduce(step_compute_time, op=MPI.SUM)
+            log_step_imbalance.set_quantity(max_time * nparts / sum_time
+                                            if sum_time else 1.0)
+            return state
+
+        my_timestepper = imbalance_timestepper
 
     if timestepping_on:
         if rank == 0:
@@ -1174,26 +2797,31 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
                   f" {current_dt=}")
 
         current_step, current_t, current_state = \
-            advance_state(rhs=my_rhs, timestepper=timestepper,
+            advance_state(rhs=my_rhs, timestepper=my_timestepper,
                           pre_step_callback=pre_step_func, istep=current_step,
                           post_step_callback=post_step_func, dt=current_dt,
-                          state=make_obj_array([current_cv, temperature_seed]),
+                          state=current_state,
                           t=current_t, t_final=t_final)
 
     # Dump the final data
     if rank == 0:
         logger.info("Checkpointing final state ...")
 
-    final_cv, tseed = current_state
+    final_cv, tseed = current_state[0], current_state[1]
     final_fluid_state = construct_fluid_state(final_cv, tseed)
     final_dv = final_fluid_state.dv
     dt = get_sim_timestep(discr, final_fluid_state, current_t, current_dt,
                                   current_cfl, t_final, constant_cfl)
 
     my_write_viz(step=current_step, t=current_t, cv=final_cv, dv=final_dv)
-    my_write_status(dt=dt, cfl=current_cfl, dv=final_dv)
+    final_stats = my_get_state_stats(final_cv, final_dv)
+    my_write_status(dt=dt, cfl=current_cfl, stats=final_stats)
     my_write_restart(step=current_step, t=current_t, state=final_fluid_state,
                      temperature_seed=tseed)
+    if restart_writer is not None:
+        restart_writer.close()
+    if vis_writer is not None:
+        vis_writer.close()
 
     if logmgr:
         logmgr.close()
@@ -1205,14 +2833,62 @@ def main(ctx_factory=cl.create_some_context, use_logmgr=True,
     finish_tol = 1e-16
     assert np.abs(current_t - t_final) < finish_tol
 
-    health_errors = global_reduce(my_health_check(cv=final_cv, dv=final_dv),
-                                  op="lor")
+    health_errors = my_health_check(final_stats)
     if health_errors:
         if rank == 0:
             logger.info("Fluid solution failed health check.")
         raise MyRuntimeError("Failed simulation health check.")
 
 
+@mpi_entry_point
+def main(ctx_factory=cl.create_some_context, use_logmgr=True,
+         use_leap=False, use_overintegration=False,
+         use_profiling=False, casename=None, lazy=False,
+         rst_filename=None, actx_class=PyOpenCLArrayContext,
+         log_dependent=False, input_file=None, compile_only=False):
+    """Drive example.
+
+    *input_file* may be a list of input files, in which case the cases are
+    run one after another, sharing the CL context, queue, memory pool and
+    array context.  The cases do not share compiled programs: each case
+    builds its own discretization and RHS and compiles them anew.  The
+    saving is in the interpreter, import, and context startup.
+    """
+    from mpi4py import MPI
+    comm = MPI.COMM_WORLD
+
+    if input_file is None or isinstance(input_file, str):
+        input_files = [input_file]
+    else:
+        input_files = list(input_file)
+
+    cl_ctx = ctx_factory()
+
+    if use_profiling:
+        queue = cl.CommandQueue(cl_ctx,
+            properties=cl.command_queue_properties.PROFILING_ENABLE)
+    else:
+        queue = cl.CommandQueue(cl_ctx)
+
+    allocator = CountingAllocator(
+        cl_tools.MemoryPool(cl_tools.ImmediateAllocator(queue)))
+    if lazy:
+        actx = actx_class(comm, queue, mpi_base_tag=12000, allocator=allocator)
+    else:
+        actx = actx_class(comm, queue, allocator=allocator,
+                force_device_scalars=True)
+
+    for icase, case_input_file in enumerate(input_files):
+        if len(input_files) > 1 and comm.Get_rank() == 0:
+            logger.info(f"#### Case {icase+1}/{len(input_files)}: "
+                        f"{case_input_file} ####")
+        run_case(actx, use_logmgr=use_logmgr, use_leap=use_leap,
+                 use_overintegration=use_overintegration,
+                 use_profiling=use_profiling, casename=casename, lazy=lazy,
+                 rst_filename=rst_filename, log_dependent=log_dependent,
+                 input_file=case_input_file, compile_only=compile_only)
+
+
 if __name__ == "__main__":
     import argparse
     casename = "combozzle"
@@ -1220,7 +2896,8 @@ if __name__ == "__main__":
     parser.add_argument("--overintegration", action="store_true",
         help="use overintegration in the RHS computations")
     parser.add_argument("-i", "--input_file", type=ascii, dest="input_file",
-                        nargs="?", action="store", help="simulation config file")
+                        nargs="*", action="store",
+                        help="simulation config file(s) or glob pattern(s)")
     parser.add_argument("--lazy", action="store_true",
         help="switch to a lazy computation mode")
     parser.add_argument("--profiling", action="store_true",
@@ -1231,6 +2908,8 @@ if __name__ == "__main__":
         help="use leap timestepper")
     parser.add_argument("--restart_file", help="root name of restart file")
     parser.add_argument("--casename", help="casename to use for i/o")
+    parser.add_argument("--compile-only", action="store_true", dest="compile_only",
+        help="compile all kernels for the configuration and exit")
     args = parser.parse_args()
     from warnings import warn
     warn("Automatically turning off DV logging. MIRGE-Com Issue(578)")
@@ -1252,8 +2931,13 @@ if __name__ == "__main__":
 
     input_file = None
     if args.input_file:
-        input_file = args.input_file.replace("'", "")
-        print(f"Reading user input from file: {input_file}")
+        import glob
+        input_files = []
+        for pattern in args.input_file:
+            pattern = pattern.replace("'", "")
+            input_files.extend(sorted(glob.glob(pattern)) or [pattern])
+        input_file = input_files[0] if len(input_files) == 1 else input_files
+        print(f"Reading user input from file(s): {input_files}")
     else:
         print("No user input file, using default values")
 
@@ -1261,6 +2945,6 @@ if __name__ == "__main__":
          use_overintegration=args.overintegration,
          use_profiling=args.profiling, lazy=lazy,
          casename=casename, rst_filename=rst_filename, actx_class=actx_class,
-         log_dependent=log_dependent)
+         log_dependent=log_dependent, compile_only=args.compile_only)
 
 # vim: foldmethod=marker
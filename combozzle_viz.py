@@ -0,0 +1,78 @@
+"""Visualization file writer for the worker processes of combozzle.
+
+This module imports only numpy and pyvisfile, so that the worker processes
+that run it (see :class:`combozzle.AsyncVisWriter`) start without the MPI
+and CL runtimes.
+
+.. autofunction:: write_host_vtk_file
+"""
+
+__copyright__ = """
+Copyright (C) 2020 University of Illinois Board of Trustees
+"""
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import numpy as np
+from pyvisfile.vtk import (
+    UnstructuredGrid, DataArray, AppendedDataXMLGenerator,
+    ParallelXMLGenerator, VF_LIST_OF_COMPONENTS
+)
+
+
+_geometries = {}
+
+
+def _get_geometry(geometry_file):
+    """Return the *(nodes, cells, cell_types)* stored in *geometry_file*.
+
+    Each worker loads a geometry once, the first time it writes a file for it.
+    """
+    if geometry_file not in _geometries:
+        with np.load(geometry_file) as geometry:
+            _geometries[geometry_file] = (
+                geometry["nodes"], geometry["cells"], geometry["cell_types"])
+    return _geometries[geometry_file]
+
+
+def write_host_vtk_file(geometry_file, filename, names_and_fields,
+                        par_filename=None, par_filenames=None):
+    """Write host visualization data to a VTK file.
+
+    The geometry is read from *geometry_file*, an ``.npz`` file with the
+    VTK *nodes*, *cells* and *cell_types*.  If *par_filename* is given, the
+    parallel file referring to *par_filenames* is written as well.
+    """
+    nodes, cells, cell_types = _get_geometry(geometry_file)
+    grid = UnstructuredGrid(
+        (nodes.shape[1], DataArray("points", nodes,
+                                   vector_format=VF_LIST_OF_COMPONENTS)),
+        cells=cells, cell_types=cell_types)
+    for name, field in names_and_fields:
+        grid.add_pointdata(DataArray(name, field,
+                                     vector_format=VF_LIST_OF_COMPONENTS))
+
+    with open(filename, "w") as outf:
+        AppendedDataXMLGenerator()(grid).write(outf)
+
+    if par_filename is not None:
+        with open(par_filename, "w") as outf:
+            ParallelXMLGenerator(par_filenames)(grid).write(outf)
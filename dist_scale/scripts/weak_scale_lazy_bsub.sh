@@ -8,14 +8,24 @@
 
 . ./mirge_batch_env.sh
 . ${EMIRGE_HOME}/config/activate_env.sh
+# PARTITION=slab|pencil|block|graph overrides the partitioner of the configs
+LOG_SUFFIX=""
+if [[ -n "${PARTITION}" ]]; then
+    LOG_SUFFIX="_${PARTITION}"
+fi
 set -x
 for nrank in 1 2 4 8 16
 do
     export CONFIG_FILE=./run_config/weak_${nrank}.yaml
     rm -f run_config.yaml
-    ln -s ${CONFIG_FILE} run_config.yaml
+    if [[ -n "${PARTITION}" ]]; then
+        cp ${CONFIG_FILE} run_config.yaml
+        printf "partition: ${PARTITION}\n" >> run_config.yaml
+    else
+        ln -s ${CONFIG_FILE} run_config.yaml
+    fi
     printf "jsrun -g 1 -a 1 -n $nrank bash -c 'POCL_CACHE_DIR=$POCL_CACHE_DIR_ROOT/$$ python -O -m mpi4py ./combozzle.py -i ${config_file} --lazy'\n"
     jsrun -g 1 -a 1 -n $nrank bash -c 'POCL_CACHE_DIR=$POCL_CACHE_DIR_ROOT/$$ python -O -m mpi4py ./combozzle.py -i run_config.yaml --lazy'
-    mkdir -p run_n${nrank}_logs
-    mv *sqlite run_n${nrank}_logs
+    mkdir -p run_n${nrank}${LOG_SUFFIX}_logs
+    mv *sqlite run_n${nrank}${LOG_SUFFIX}_logs
 done
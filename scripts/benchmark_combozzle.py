@@ -0,0 +1,275 @@
+"""Run a small feature-matrix benchmark of combozzle on a local (CPU) device.
+
+Each case is a small configuration that toggles one combozzle feature
+relative to a base configuration, at each of a few orders, in eager and
+lazy mode. Every case runs the driver in its own process and working
+directory. The warm-up and steady-state step times are read from its
+rank-0 sqlite log and collected into a JSON results file, which can be
+compared against a stored baseline:
+
+> python scripts/benchmark_combozzle.py -o bench.json
+> python scripts/benchmark_combozzle.py -o new.json --baseline bench.json
+
+The comparison exits with a non-zero status if any case's steady-state step
+time exceeds its baseline by more than the tolerance (or if a case that
+passed in the baseline fails).
+"""
+
+__copyright__ = """
+Copyright (C) 2020 University of Illinois Board of Trustees
+"""
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import sqlite3
+import platform
+import subprocess
+import tempfile
+import yaml
+import numpy as np
+
+
+DRIVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..",
+                      "combozzle.py")
+
+# Small enough to run in seconds per step on a CPU device
+BASE_CONFIG = {
+    "dim": 2,
+    "order": 1,
+    "chlen": .25,
+    "weak_scale": 1,
+    "nspecies": 0,
+    "inert_only": 1,
+    "inviscid_only": 0,
+    "dummy_rhs_only": 0,
+    "artificial_viscosity_on": 1,
+    "sponge_on": 1,
+    "integrator": "euler",
+    "periodic_boundary": 1,
+    "do_checkpoint": 0,
+    "current_dt": 1e-8,
+    "constant_cfl": 0,
+}
+
+# Each feature case toggles one thing relative to BASE_CONFIG. The special
+# key "overintegration" maps to the driver's --overintegration flag.
+FEATURE_CASES = {
+    "base": {},
+    "dummy_rhs": {"dummy_rhs_only": 1},
+    "inviscid": {"inviscid_only": 1},
+    # the driver takes the species of reactive runs from the (7-species)
+    # uiuc mechanism; say so rather than inherit the base's "nspecies: 0"
+    "reactive": {"inert_only": 0, "nspecies": 7},
+    "no_av": {"artificial_viscosity_on": 0},
+    "no_sponge": {"sponge_on": 0},
+    "overintegration": {"overintegration": True},
+    "rk4": {"integrator": "rk4"},
+    "lsrk54": {"integrator": "lsrk54"},
+    "lsrk144": {"integrator": "lsrk144"},
+}
+
+
+def get_case_name(feature, order, lazy):
+    mode = "lazy" if lazy else "eager"
+    return f"{feature}-p{order}-{mode}"
+
+
+def read_step_times(sqlite_filename):
+    """Return the init time and per-step times stored in a combozzle log."""
+    with sqlite3.connect(sqlite_filename) as conn:
+        t_init = conn.execute("select value from t_init").fetchone()
+        t_step = conn.execute("select value from t_step order by step")
+        step_times = [row[0] for row in t_step.fetchall()]
+    return (t_init[0] if t_init else None), step_times
+
+
+def summarize_step_times(step_times, nwarmup):
+    """Split the step times into warm-up and steady-state statistics."""
+    warmup = step_times[:nwarmup]
+    steady = np.array(step_times[nwarmup:])
+    summary = {
+        "warmup_time": float(np.sum(warmup)),
+        "nsteady": len(steady),
+    }
+    if len(steady):
+        summary.update({
+            "step_time": float(np.median(steady)),
+            "step_time_mean": float(np.mean(steady)),
+            "step_time_min": float(np.min(steady)),
+            "step_time_max": float(np.max(steady)),
+        })
+    return summary
+
+
+def run_case(name, overrides, lazy, nsteps, nwarmup, timeout=None):
+    """Run a single benchmark case in a scratch directory."""
+    config = dict(BASE_CONFIG)
+    config.update(overrides)
+    overintegration = config.pop("overintegration", False)
+    config["t_final"] = nsteps*config["current_dt"]
+
+    result = {"config": config, "lazy": lazy,
+              "overintegration": overintegration}
+
+    with tempfile.TemporaryDirectory(prefix=f"bench-{name}-") as workdir:
+        config_file = os.path.join(workdir, "bench_config.yaml")
+        with open(config_file, "w") as outf:
+            yaml.dump(config, outf)
+
+        cmd = [sys.executable, "-m", "mpi4py", os.path.abspath(DRIVER),
+               "-i", config_file, "--casename", name]
+        if lazy:
+            cmd.append("--lazy")
+        if overintegration:
+            cmd.append("--overintegration")
+
+        start_time = time.perf_counter()
+        try:
+            proc = subprocess.run(cmd, cwd=workdir, capture_output=True,
+                                  text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            result.update({"status": "timeout"})
+            return result
+        result["wall_time"] = time.perf_counter() - start_time
+
+        if proc.returncode != 0:
+            result.update({"status": "failed",
+                           "stderr": proc.stderr[-4000:]})
+            return result
+
+        log_files = sorted(glob.glob(os.path.join(workdir,
+                                                  f"{name}-*rank0-*.sqlite")))
+        if not log_files:
+            result.update({"status": "failed", "stderr": "no sqlite log"})
+            return result
+
+        t_init, step_times = read_step_times(log_files[-1])
+
+    result.update({"status": "ok", "t_init": t_init})
+    result.update(summarize_step_times(step_times, nwarmup))
+    return result
+
+
+def compare_results(results, baseline, tolerance):
+    """Compare *results* against *baseline* and print a table.
+
+    Returns the names of the cases that regressed.
+    """
+    regressions = []
+    print(f"{'case':<32} {'baseline':>12} {'current':>12} {'ratio':>8}")
+    for name, case in sorted(results["cases"].items()):
+        base_case = baseline["cases"].get(name)
+        if base_case is None or base_case.get("status") != "ok":
+            print(f"{name:<32} {'-':>12} {case.get('step_time', '-'):>12}")
+            continue
+        if case.get("status") != "ok" or "step_time" not in case:
+            print(f"{name:<32} {base_case['step_time']:>12.6g} "
+                  f"{case['status']:>12}  REGRESSION")
+            regressions.append(name)
+            continue
+
+        ratio = case["step_time"] / base_case["step_time"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<32} {base_case['step_time']:>12.6g} "
+              f"{case['step_time']:>12.6g} {ratio:>8.3f}{flag}")
+    return regressions
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Combozzle feature-matrix benchmark")
+    parser.add_argument("-o", "--output", default="combozzle_bench.json",
+        help="JSON file for the results")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+        help="allowed relative slowdown of the steady-state step time")
+    parser.add_argument("--orders", type=int, nargs="+", default=[1, 2],
+        help="polynomial orders to run")
+    parser.add_argument("--features", nargs="+", choices=list(FEATURE_CASES),
+        default=list(FEATURE_CASES), help="feature cases to run")
+    parser.add_argument("--modes", nargs="+", choices=["eager", "lazy"],
+        default=["eager", "lazy"], help="array context modes to run")
+    parser.add_argument("--nsteps", type=int, default=20,
+        help="number of steps per case")
+    parser.add_argument("--nwarmup", type=int, default=2,
+        help="number of leading steps counted as warm-up")
+    parser.add_argument("--timeout", type=float, default=None,
+        help="per-case timeout (s)")
+    parser.add_argument("--cl-ctx", dest="cl_ctx", default=None,
+        help="PYOPENCL_CTX to run on (default: environment, else 'port')")
+    args = parser.parse_args()
+
+    if args.cl_ctx is not None:
+        os.environ["PYOPENCL_CTX"] = args.cl_ctx
+    else:
+        os.environ.setdefault("PYOPENCL_CTX", "port")
+
+    results = {
+        "meta": {
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "machine": platform.node(),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "pyopencl_ctx": os.environ["PYOPENCL_CTX"],
+            "nsteps": args.nsteps,
+            "nwarmup": args.nwarmup,
+        },
+        "cases": {}
+    }
+
+    for order in args.orders:
+        for mode in args.modes:
+            for feature in args.features:
+                lazy = mode == "lazy"
+                name = get_case_name(feature, order, lazy)
+                overrides = dict(FEATURE_CASES[feature], order=order)
+                print(f"Running {name} ...", flush=True)
+                case = run_case(name, overrides, lazy, args.nsteps,
+                                args.nwarmup, timeout=args.timeout)
+                results["cases"][name] = case
+                print(f"\t{case['status']}, step time: "
+                      f"{case.get('step_time', '-')}", flush=True)
+
+                # write as we go, so an interrupted suite keeps its results
+                with open(args.output, "w") as outf:
+                    json.dump(results, outf, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as inf:
+            baseline = json.load(inf)
+        regressions = compare_results(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
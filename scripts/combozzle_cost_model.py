@@ -0,0 +1,575 @@
+"""Fit a cost model of combozzle runs from their sqlite logs.
+
+For each software variant (the array context stack, e.g. the legacy or the
+fusion one, see :func:`get_variant`), array context mode (eager/lazy) and
+dimension, the steady-state step time, the startup time (init plus first
+step, which includes the compilation in lazy mode) and the peak device and
+host memory of the logged runs are fitted, by non-negative least squares in
+the relative error, as linear combinations of a few terms of the run
+parameters (DOFs per rank, order, number of species and ranks):
+
+> python scripts/combozzle_cost_model.py fit grid_scale dist_scale -o model.yaml
+
+The model then predicts these quantities for a proposed combozzle input file,
+to size production runs and their allocations before submitting them:
+
+> python scripts/combozzle_cost_model.py predict model.yaml case.yaml --nranks 4
+
+and flags logged runs that deviate from its predictions (with a non-zero
+exit status):
+
+> python scripts/combozzle_cost_model.py check model.yaml new_logs
+
+The logs do not record all of the run parameters (older drivers did not log
+``nspecies`` or the array context mode). For those, the input file named in
+the logged command line is looked up next to the logs (or in their parent
+directories), and the mode is taken from the command line. Runs whose number
+of species is not known this way are skipped, with a warning, unless it is
+given with ``--nspecies``.
+"""
+
+__copyright__ = """
+Copyright (C) 2020 University of Illinois Board of Trustees
+"""
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import os
+import re
+import sys
+from math import comb
+import numpy as np
+import yaml
+
+from combozzle_logs import find_log_files, read_run_logs, get_rank_reduced, \
+    summarize_run
+
+
+# {{{ run parameters
+
+# Defaults of combozzle.py
+CONFIG_DEFAULTS = {
+    "dim": 3,
+    "order": 1,
+    "chlen": .25,
+    "domain_xlen": 1.,
+    "domain_ylen": 1.,
+    "domain_zlen": 1.,
+    "x_scale": 1,
+    "y_scale": 1,
+    "z_scale": 1,
+    "weak_scale": 1,
+    "h_scale": 1,
+    "nspecies": 7,
+    "inert_only": 0,
+    "single_gas_only": 0,
+    "integrator": "euler",
+}
+
+# Number of species of the (uiuc) mechanism used by reactive runs
+MECHANISM_NSPECIES = 7
+
+NSTAGES = {"euler": 1, "rk4": 4, "lsrk54": 5, "lsrk144": 14}
+
+# Simplices per box cell of the generated meshes, by dimension
+SIMPLICES_PER_CELL = {1: 1, 2: 2, 3: 6}
+
+
+def get_config_params(config):
+    """Return the run parameters that the combozzle *config* would use."""
+    params = dict(CONFIG_DEFAULTS)
+    params.update({key: value for key, value in config.items()
+                   if key in CONFIG_DEFAULTS})
+
+    dim = int(params["dim"])
+    chlen = float(params["chlen"])
+    weak_scale = float(params["weak_scale"])
+    nelements = SIMPLICES_PER_CELL[dim]
+    for axis in "xyz"[:dim]:
+        size = (float(params[f"domain_{axis}len"])
+                * float(params[f"{axis}_scale"]) * weak_scale)
+        nelements *= int(size / chlen) * int(params["h_scale"])
+
+    if int(params["single_gas_only"]):
+        nspecies = 0
+    elif not int(params["inert_only"]):
+        nspecies = MECHANISM_NSPECIES
+    else:
+        nspecies = int(params["nspecies"])
+
+    return {"dim": dim, "order": int(params["order"]),
+            "nelements": nelements, "nspecies": nspecies,
+            "integrator": params["integrator"]}
+
+
+def _find_input_config(run):
+    """Return the input config named in the command line of *run*, if found."""
+    cmdline = run["constants"].get("cmdline")
+    match = re.search(r"-i\s+['\"]?([^\s'\"]+)", cmdline or "")
+    if match is None:
+        return None
+    logdir = os.path.dirname(os.path.abspath(run["path"]))
+    for basedir in [logdir, os.path.dirname(logdir),
+                    os.path.dirname(os.path.dirname(logdir))]:
+        filename = os.path.join(basedir, match.group(1))
+        if os.path.isfile(filename):
+            with open(filename) as inf:
+                return yaml.safe_load(inf)
+    return None
+
+
+ARRAYCONTEXT_SOURCE_RE = re.compile(
+    r"github\.com/(?P<owner>[\w.-]+)/arraycontext(?:\.git)?@(?P<rev>[0-9a-f]+)")
+
+
+def get_variant(run):
+    """Return the software variant of a logged *run*.
+
+    The variant is the source of its :mod:`arraycontext` (e.g.
+    ``inducer@03f527a`` for the legacy and ``kaushikcfd@7ff8bfa`` for the
+    fusion array context of the grid scaling logs), as recorded in the
+    ``emirge_package_versions``, or ``unknown``. The array context, and the
+    loopy, pytato and grudge versions that go with it, change the costs too
+    much to fit runs of different variants together.
+    """
+    versions = run["constants"].get("emirge_package_versions")
+    if isinstance(versions, bytes):
+        versions = versions.decode(errors="replace")
+    match = ARRAYCONTEXT_SOURCE_RE.search(versions or "")
+    if match is None:
+        return "unknown"
+    return f"{match.group('owner')}@{match.group('rev')[:7]}"
+
+
+def get_run_params(run, nspecies=None):
+    """Return the run parameters of a logged *run*.
+
+    Returns a tuple *(params, reason)*, where *params* is *None* if the
+    parameters are unknown, and *reason* then says which. If neither the log
+    nor the input file give the number of species, it is *nspecies*, if
+    given, and the parameters are marked as ``assumed``.
+    """
+    constants = run["constants"]
+    if "lazy" in constants:
+        lazy = bool(constants["lazy"])
+    elif isinstance(constants.get("cmdline"), str):
+        lazy = "--lazy" in constants["cmdline"].split()
+    else:
+        return None, "unknown array context mode"
+
+    config = _find_input_config(run)
+    config_params = get_config_params(config or {})
+    params = {
+        "variant": get_variant(run),
+        "mode": "lazy" if lazy else "eager",
+        "dim": run["dim"], "order": run["order"],
+        "nelements": run["nelements"], "nranks": run["nranks"],
+        "nspecies": constants.get("nspecies", config_params["nspecies"]),
+        "integrator": config_params["integrator"],
+        "assumed": False,
+    }
+    if config is None and "nspecies" not in constants:
+        if nspecies is None:
+            return None, "unknown number of species"
+        params.update({"nspecies": nspecies, "assumed": True})
+    return params, None
+
+
+def _warn_skipped(skipped):
+    """Print a warning for the runs in *skipped*, by reason."""
+    for reason, paths in sorted(skipped.items()):
+        print(f"Warning: skipped {len(paths)} run(s) with an {reason}:",
+              file=sys.stderr)
+        for path in paths:
+            print(f"\t{path}", file=sys.stderr)
+
+# }}}
+
+
+# {{{ model terms
+
+TARGETS = ["step_time", "startup_time", "memory_gpu", "memory_host"]
+
+# Candidate terms of each target, in order of preference
+TARGET_TERMS = {
+    "step_time": ["one", "order", "work", "work_order", "comm"],
+    "startup_time": ["one", "order", "state", "nranks"],
+    "memory_gpu": ["one", "state", "state_order"],
+    "memory_host": ["one", "state", "nranks"],
+}
+
+
+def get_terms(params):
+    """Return the model terms of the run *params*.
+
+    *state* is the number of conserved-variable DOFs per rank (in millions),
+    *work* additionally counts the RHS evaluations per step, and *comm*
+    approximates the size of the rank boundaries in the same units.
+    """
+    dim = params["dim"]
+    order = params["order"]
+    ndofs = params["nelements"] * comb(order + dim, dim) / params["nranks"]
+    nvars = dim + 2 + params["nspecies"]
+    state = ndofs * nvars / 1e6
+    work = state * NSTAGES.get(params["integrator"], 1)
+    return {
+        "one": 1.,
+        "order": order,
+        "nranks": params["nranks"],
+        "state": state,
+        "state_order": state * order,
+        "work": work,
+        "work_order": work * order,
+        "comm": (work**((dim - 1) / dim) if params["nranks"] > 1 else 0.),
+    }
+
+
+def get_targets(run, nwarmup=2):
+    """Return the measured targets of a logged *run*."""
+    summary = summarize_run(run, nwarmup=nwarmup)
+    targets = {"step_time": summary.get("step_median")}
+    if summary["time_startup"] is not None \
+            and summary["time_first_step"] is not None:
+        targets["startup_time"] = (summary["time_startup"]
+                                   + summary["time_first_step"])
+    for target, name in [("memory_gpu", "memory_usage_gpu"),
+                         ("memory_host", "memory_usage_python")]:
+        _, values = get_rank_reduced(run, name)
+        values = values[np.isfinite(values)]
+        if len(values):
+            targets[target] = float(np.max(values))
+    return targets
+
+# }}}
+
+
+# {{{ fitting
+
+def nnls(a, b):
+    """Return the *x* >= 0 that minimizes ``|a @ x - b|``.
+
+    This is the active set method of Lawson and Hanson, for the few terms
+    of the model (and to not depend on :mod:`scipy` for it).
+    """
+    nrows, ncols = a.shape
+    tol = 10 * np.finfo(float).eps * np.linalg.norm(a, 1) * max(nrows, ncols)
+    x = np.zeros(ncols)
+    passive = np.zeros(ncols, dtype=bool)
+    gradient = a.T @ b
+    for _ in range(3 * ncols):
+        if passive.all() or np.max(gradient[~passive]) <= tol:
+            break
+        passive[np.argmax(np.where(passive, -np.inf, gradient))] = True
+        while True:
+            z = np.zeros(ncols)
+            z[passive], *_ = np.linalg.lstsq(a[:, passive], b, rcond=None)
+            if np.min(z[passive]) > 0:
+                break
+            # step back to the boundary, and free the terms that reach it
+            blocking = passive & (z <= 0)
+            alpha = np.min(x[blocking] / (x[blocking] - z[blocking]))
+            x = x + alpha * (z - x)
+            passive &= x > tol
+            x[~passive] = 0
+            if not passive.any():
+                z = x
+                break
+        x = z
+        gradient = a.T @ (b - a @ x)
+    return x
+
+
+def fit_target(samples, target):
+    """Fit *target* over *samples* (pairs of terms and measured targets).
+
+    Minimizes the relative error, with non-negative coefficients: every term
+    stands for a cost, and a negative coefficient would only compensate for
+    another term within the range of the samples (and predict nonsense, or
+    negative costs, outside of it). Terms that do not vary independently in
+    the samples are left out, so that the model does not extrapolate along
+    directions it has not seen, as are those that the fit zeroes.
+    """
+    samples = [(terms, targets[target]) for terms, targets in samples
+               if targets.get(target)]
+    if not samples:
+        return None
+
+    y = np.array([value for _, value in samples])
+    terms = []
+    columns = []
+    for term in TARGET_TERMS[target]:
+        column = np.array([sample_terms[term] for sample_terms, _ in samples])
+        candidate = np.column_stack(columns + [column]) / y[:, None]
+        # keep at least one term, and more only if they leave residuals
+        if (np.linalg.matrix_rank(candidate) == len(columns) + 1
+                and (not columns or len(columns) + 1 < len(samples))):
+            terms.append(term)
+            columns.append(column)
+
+    x = np.column_stack(columns)
+    coefficients = nnls(x / y[:, None], np.ones_like(y))
+    rel_error = x @ coefficients / y - 1
+    return {
+        "terms": [term for term, c in zip(terms, coefficients) if c > 0],
+        "coefficients": [float(c) for c in coefficients if c > 0],
+        "rel_error_rms": float(np.sqrt(np.mean(rel_error**2))),
+        "nsamples": len(samples),
+    }
+
+
+def fit_cost_model(paths, nwarmup=2, nspecies=None):
+    """Fit the cost model of the runs logged in *paths*.
+
+    Runs with an unknown number of species are skipped (with a warning),
+    unless *nspecies* is given for them.
+    """
+    runs = read_run_logs(find_log_files(paths),
+                         quantities={"t_init", "t_step", "memory_usage_gpu",
+                                     "memory_usage_python"})
+    samples = {}
+    skipped = {}
+    nassumed = 0
+    for run in runs:
+        params, reason = get_run_params(run, nspecies=nspecies)
+        if params is None:
+            skipped.setdefault(reason, []).append(run["path"])
+            continue
+        nassumed += params["assumed"]
+        key = (params["variant"], params["mode"], params["dim"])
+        samples.setdefault(key, []).append(
+            (params, get_terms(params), get_targets(run, nwarmup=nwarmup)))
+    _warn_skipped(skipped)
+    if nassumed:
+        print(f"Assumed {nspecies} species for {nassumed} run(s) whose "
+              "input file was not found.")
+
+    models = []
+    for (variant, mode, dim), key_samples in sorted(samples.items()):
+        model = {"variant": variant, "mode": mode, "dim": dim, "ranges": {},
+                 "targets": {}}
+        for name in ["order", "nelements", "nranks", "nspecies"]:
+            values = [params[name] for params, _, _ in key_samples]
+            model["ranges"][name] = [min(values), max(values)]
+        for target in TARGETS:
+            fit = fit_target([(terms, targets)
+                              for _, terms, targets in key_samples], target)
+            if fit is not None:
+                model["targets"][target] = fit
+        models.append(model)
+    return models
+
+
+def get_model(models, variant, mode, dim):
+    """Return the model of *variant*, *mode* and *dim* in *models*, if any.
+
+    If *variant* is *None*, the model of *mode* and *dim* is only returned
+    if it is the only one.
+    """
+    matching = [model for model in models
+                if model["mode"] == mode and model["dim"] == dim
+                and variant in [None, model["variant"]]]
+    if len(matching) != 1:
+        return None
+    return matching[0]
+
+
+def predict(models, params):
+    """Return the predicted targets for the run *params*.
+
+    Also returns the parameters that lie outside of those the model was
+    fitted to.
+    """
+    model = get_model(models, params["variant"], params["mode"], params["dim"])
+    if model is None:
+        return {}, ["variant/mode/dim"]
+    terms = get_terms(params)
+    predictions = {
+        target: sum(c * terms[term]
+                    for term, c in zip(fit["terms"], fit["coefficients"]))
+        for target, fit in model["targets"].items()
+    }
+    extrapolated = [name for name, (lo, hi) in model["ranges"].items()
+                    if not lo <= params[name] <= hi]
+    return predictions, extrapolated
+
+# }}}
+
+
+# {{{ reports
+
+TARGET_UNITS = {"step_time": "s", "startup_time": "s", "memory_gpu": "MB",
+                "memory_host": "MB"}
+
+
+def print_model(models):
+    for model in models:
+        print(f"{model['variant']} {model['mode']} {model['dim']}d "
+              f"(order {model['ranges']['order']}, "
+              f"elements {model['ranges']['nelements']}, "
+              f"ranks {model['ranges']['nranks']}):")
+        for target, fit in model["targets"].items():
+            terms = " + ".join(f"{c:.4g}*{term}" for term, c
+                               in zip(fit["terms"], fit["coefficients"]))
+            print(f"\t{target} [{TARGET_UNITS[target]}] = {terms}  "
+                  f"(rms rel. error {fit['rel_error_rms']:.1%}, "
+                  f"{fit['nsamples']} runs)")
+
+
+def check_runs(models, paths, nwarmup=2, nsigma=3., tolerance=0.1,
+               nspecies=None):
+    """Compare the runs logged in *paths* to the predictions of *models*.
+
+    A target deviates if its relative error exceeds *nsigma* times the rms
+    relative error of the fit, or *tolerance*, whichever is larger. Returns
+    the report rows.
+    """
+    runs = read_run_logs(find_log_files(paths),
+                         quantities={"t_init", "t_step", "memory_usage_gpu",
+                                     "memory_usage_python"})
+    rows = []
+    skipped = {}
+    for run in sorted(runs, key=lambda run: run["path"]):
+        params, reason = get_run_params(run, nspecies=nspecies)
+        if params is None:
+            skipped.setdefault(reason, []).append(run["path"])
+            continue
+        predictions, extrapolated = predict(models, params)
+        model = get_model(models, params["variant"], params["mode"],
+                          params["dim"])
+        targets = get_targets(run, nwarmup=nwarmup)
+        deviations = []
+        for target, predicted in predictions.items():
+            if not targets.get(target) or not predicted:
+                continue
+            rel_error = targets[target] / predicted - 1
+            limit = max(nsigma * model["targets"][target]["rel_error_rms"],
+                        tolerance)
+            if abs(rel_error) > limit:
+                deviations.append(f"{target} {rel_error:+.0%}")
+        rows.append({"path": run["path"], "params": params,
+                     "deviations": deviations, "extrapolated": extrapolated})
+    _warn_skipped(skipped)
+    return rows
+
+# }}}
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Fit and apply a cost model of combozzle runs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    fit_parser = subparsers.add_parser("fit", help="fit a model to sqlite logs")
+    fit_parser.add_argument("paths", nargs="+",
+        help="sqlite log files and/or directories to search for logs")
+    fit_parser.add_argument("-o", "--output", default="combozzle_model.yaml",
+        help="output model file")
+    fit_parser.add_argument("--nwarmup", type=int, default=2,
+        help="number of leading steps excluded from the steady state")
+    fit_parser.add_argument("--nspecies", type=int, default=None,
+        help="number of species of runs whose input file is not found "
+             "(default: skip them)")
+
+    predict_parser = subparsers.add_parser("predict",
+        help="predict the cost of combozzle input files")
+    predict_parser.add_argument("model", help="model file")
+    predict_parser.add_argument("configs", nargs="+",
+        help="combozzle input files")
+    predict_parser.add_argument("--nranks", type=int, default=1,
+        help="number of ranks")
+    predict_parser.add_argument("--mode", choices=["eager", "lazy"],
+        default="lazy", help="array context mode")
+    predict_parser.add_argument("--variant", default=None,
+        help="software variant (default: the only one of the mode and "
+             "dimension in the model)")
+
+    check_parser = subparsers.add_parser("check",
+        help="flag logged runs that deviate from the model")
+    check_parser.add_argument("model", help="model file")
+    check_parser.add_argument("paths", nargs="+",
+        help="sqlite log files and/or directories to search for logs")
+    check_parser.add_argument("--nsigma", type=float, default=3.,
+        help="deviation limit, in rms relative errors of the fit")
+    check_parser.add_argument("--tolerance", type=float, default=0.1,
+        help="smallest relative deviation flagged")
+    check_parser.add_argument("--nwarmup", type=int, default=2,
+        help="number of leading steps excluded from the steady state")
+    check_parser.add_argument("--nspecies", type=int, default=None,
+        help="number of species of runs whose input file is not found "
+             "(default: skip them)")
+
+    args = parser.parse_args()
+
+    if args.command == "fit":
+        models = fit_cost_model(args.paths, nwarmup=args.nwarmup,
+                                nspecies=args.nspecies)
+        print_model(models)
+        with open(args.output, "w") as outf:
+            yaml.dump(models, outf, sort_keys=False)
+        return 0
+
+    with open(args.model) as inf:
+        models = yaml.safe_load(inf)
+
+    if args.command == "predict":
+        for filename in args.configs:
+            with open(filename) as inf:
+                params = get_config_params(yaml.safe_load(inf) or {})
+            params.update({"variant": args.variant, "mode": args.mode,
+                           "nranks": args.nranks})
+            print(f"{filename}: {params['dim']}d, order {params['order']}, "
+                  f"{params['nelements']} elements, {params['nspecies']} "
+                  f"species, {args.nranks} rank(s), {args.mode}")
+            model = get_model(models, params["variant"], params["mode"],
+                              params["dim"])
+            if model is None:
+                variants = [model["variant"] for model in models
+                            if model["mode"] == params["mode"]
+                            and model["dim"] == params["dim"]]
+                print("\tNo (unique) model, fitted variants: "
+                      f"{', '.join(variants) or 'none'}")
+                continue
+            predictions, extrapolated = predict(models, params)
+            for target, predicted in predictions.items():
+                rel_error = model["targets"][target]["rel_error_rms"]
+                print(f"\t{target}: {predicted:.4g} {TARGET_UNITS[target]} "
+                      f"(+/- {rel_error:.0%})")
+            if extrapolated:
+                print(f"\tWarning: extrapolating in {', '.join(extrapolated)}")
+        return 0
+
+    rows = check_runs(models, args.paths, nwarmup=args.nwarmup,
+                      nsigma=args.nsigma, tolerance=args.tolerance,
+                      nspecies=args.nspecies)
+    ndeviating = 0
+    for row in rows:
+        if row["deviations"] or row["extrapolated"]:
+            print(f"{row['path']}: {', '.join(row['deviations']) or 'ok'}"
+                  + (f" (extrapolated in {', '.join(row['extrapolated'])})"
+                     if row["extrapolated"] else ""))
+        ndeviating += bool(row["deviations"])
+    print(f"{ndeviating} of {len(rows)} run(s) deviate from the model.")
+    return 1 if ndeviating else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
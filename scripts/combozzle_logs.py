@@ -0,0 +1,293 @@
+"""Summarize combozzle sqlite logs in one pass.
+
+Every (per-rank) sqlite log found under the given files or directories is
+read directly with :mod:`sqlite3`. The logs of the ranks of a run are
+grouped together, and the run parameters (dim, order, number of elements,
+number of ranks) are parsed from the log filenames, which look like
+``combozzle-d3p2e98304n1-rank0-20220404-234503.sqlite``. From the
+(max over ranks) step times, it computes the startup time, the first-step
+(compile) time, and the steady-state mean/median/p95 step times. The
+result is a single CSV or YAML table for a whole sweep:
+
+> python scripts/combozzle_logs.py grid_scale/3d/fusion_p1p2_logs -o p1p2.csv
+
+This replaces the per-file ``runalyzer`` invocations in
+``extract_timing_data.sh`` and ``generate_yaml_run_file.sh``. For
+continuity, the ``time_middle_8`` column matches the ``time_middle_8`` of
+``generate_yaml_run_file.sh``, the sum of the 8 steps 2 to 9 (counting
+from 0, ``fetchall()[2:10]``). The "middle 8" of
+``extract_timing_data.sh`` only sums the 7 steps 2 to 8
+(``fetchall()[2:9]``); it is the ``time_middle_7`` column.
+"""
+
+__copyright__ = """
+Copyright (C) 2020 University of Illinois Board of Trustees
+"""
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import os
+import re
+import sys
+import glob
+import pickle
+import sqlite3
+from collections import defaultdict
+import numpy as np
+
+
+LOG_FILENAME_RE = re.compile(
+    r"^(?P<casename>.+)-d(?P<dim>\d+)p(?P<order>\d+)e(?P<nelements>\d+)"
+    r"n(?P<nranks>\d+)-rank(?P<rank>\d+)-(?P<date>\d{8}-\d{6})\.sqlite$")
+
+SUMMARY_COLUMNS = [
+    "casename", "dim", "order", "nelements", "nranks", "date",
+    "nsteps", "time_startup", "time_first_step", "time_middle_7",
+    "time_middle_8",
+    "step_mean", "step_median", "step_p95", "step_min", "step_max",
+    "dofs_per_s", "rhs_per_s", "elsteps_per_s", "pool_misses_steady", "path"
+]
+
+# Logged by newer drivers; summarized by their steady-state median of the
+# slowest rank
+THROUGHPUT_QUANTITIES = ["dofs_per_s", "rhs_per_s", "elsteps_per_s"]
+
+
+def parse_log_filename(filename):
+    """Return the run parameters encoded in a combozzle log *filename*.
+
+    Returns *None* if *filename* does not look like a combozzle log.
+    """
+    match = LOG_FILENAME_RE.match(os.path.basename(filename))
+    if match is None:
+        return None
+    params = match.groupdict()
+    for key in ["dim", "order", "nelements", "nranks", "rank"]:
+        params[key] = int(params[key])
+    return params
+
+
+def find_log_files(paths):
+    """Return the combozzle sqlite logs in (or under) *paths*."""
+    log_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            candidates = glob.glob(os.path.join(path, "**", "*.sqlite"),
+                                   recursive=True)
+        else:
+            candidates = [path]
+        log_files.extend(filename for filename in candidates
+                         if parse_log_filename(filename) is not None)
+    return sorted(log_files)
+
+
+def read_constants(conn):
+    """Return the constants table of an open log as a :class:`dict`."""
+    constants = {}
+    for name, value in conn.execute("select name, value from constants"):
+        try:
+            constants[name] = pickle.loads(value)
+        except Exception:  # noqa: BLE001
+            constants[name] = value
+    return constants
+
+
+def get_quantity_names(conn):
+    return [row[0] for row in conn.execute("select name from quantities")]
+
+
+def read_quantity(conn, name):
+    """Return the *(steps, values)* of the quantity *name* as arrays."""
+    rows = conn.execute(f"select step, value from {name} order by step"
+                        ).fetchall()
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    steps, values = zip(*rows)
+    return (np.array(steps, dtype=np.int64),
+            np.array([np.nan if v is None else v for v in values],
+                     dtype=np.float64))
+
+
+def read_run_logs(log_files, quantities=None):
+    """Read *log_files* and group them by run.
+
+    Returns a list of runs, each a :class:`dict` with the parameters parsed
+    from the filenames, the ``path`` of the rank-0 log, the rank-0
+    ``constants`` and, under ``quantities``, for each logged quantity (or
+    just those in *quantities*) a :class:`dict` mapping each rank to its
+    *(steps, values)*.
+    """
+    runs = {}
+    for filename in log_files:
+        params = parse_log_filename(filename)
+        with sqlite3.connect(filename) as conn:
+            constants = read_constants(conn)
+            names = get_quantity_names(conn)
+            if quantities is not None:
+                names = [name for name in names if name in quantities]
+            data = {name: read_quantity(conn, name) for name in names}
+
+        # The ranks of a run share the run id, but the timestamps in their
+        # filenames may differ, and older drivers wrote e0 for the number of
+        # elements on the ranks other than 0
+        run_key = (params["casename"], params["dim"], params["order"],
+                   params["nranks"],
+                   constants.get("unique_run_id", params["date"]))
+        run = runs.setdefault(run_key, {
+            key: params[key]
+            for key in ["casename", "dim", "order", "nelements", "nranks",
+                        "date"]
+        })
+        run["nelements"] = max(run["nelements"], params["nelements"])
+        run.setdefault("quantities", defaultdict(dict))
+        for name, steps_and_values in data.items():
+            run["quantities"][name][params["rank"]] = steps_and_values
+        if params["rank"] == 0 or "path" not in run:
+            run["path"] = filename
+            run["date"] = params["date"]
+            run["constants"] = constants
+
+    return list(runs.values())
+
+
+def get_rank_reduced(run, name, reduction=np.max):
+    """Reduce quantity *name* of *run* over the ranks, step by step.
+
+    Returns *(steps, values)* over the steps logged by all ranks.
+    """
+    per_rank = run["quantities"].get(name)
+    if not per_rank:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    steps = None
+    for rank_steps, _ in per_rank.values():
+        steps = (rank_steps if steps is None
+                 else np.intersect1d(steps, rank_steps))
+    values = np.array([
+        rank_values[np.searchsorted(rank_steps, steps)]
+        for rank_steps, rank_values in per_rank.values()])
+    return steps, reduction(values, axis=0)
+
+
+def summarize_run(run, nwarmup=2):
+    """Compute the timing summary of *run* from its step times.
+
+    The first *nwarmup* steps are excluded from the steady-state statistics.
+    """
+    summary = {key: run.get(key) for key in SUMMARY_COLUMNS
+               if key in run}
+
+    _, t_init = get_rank_reduced(run, "t_init")
+    _, t_step = get_rank_reduced(run, "t_step")
+    steady = t_step[nwarmup:]
+
+    summary.update({
+        "nsteps": len(t_step),
+        "time_startup": float(t_init[0]) if len(t_init) else None,
+        "time_first_step": float(t_step[0]) if len(t_step) else None,
+        "time_middle_7": (float(np.sum(t_step[2:9]))
+                          if len(t_step) >= 9 else None),
+        "time_middle_8": (float(np.sum(t_step[2:10]))
+                          if len(t_step) >= 10 else None),
+    })
+    if len(steady):
+        summary.update({
+            "step_mean": float(np.mean(steady)),
+            "step_median": float(np.median(steady)),
+            "step_p95": float(np.percentile(steady, 95)),
+            "step_min": float(np.min(steady)),
+            "step_max": float(np.max(steady)),
+        })
+
+    for name in THROUGHPUT_QUANTITIES:
+        _, values = get_rank_reduced(run, name, reduction=np.min)
+        if len(values[nwarmup:]):
+            summary[name] = float(np.nanmedian(values[nwarmup:]))
+
+    # Device allocations the memory pool could not serve in the steady state
+    # (of the rank with the most), which should be none
+    _, pool_misses = get_rank_reduced(run, "pool_misses")
+    if len(pool_misses[nwarmup:]):
+        summary["pool_misses_steady"] = int(np.nansum(pool_misses[nwarmup:]))
+    return summary
+
+
+def summarize_logs(paths, nwarmup=2):
+    """Return the timing summaries of all runs logged in *paths*."""
+    runs = read_run_logs(find_log_files(paths),
+                         quantities={"t_init", "t_step", "pool_misses",
+                                     *THROUGHPUT_QUANTITIES})
+    summaries = [summarize_run(run, nwarmup=nwarmup) for run in runs]
+    return sorted(summaries,
+                  key=lambda s: (s["casename"], s["dim"], s["order"],
+                                 s["nranks"], s["nelements"], s["date"]))
+
+
+def write_table(rows, outf, fmt="csv", columns=None):
+    """Write the :class:`dict` *rows* to *outf* as CSV or YAML."""
+    if columns is None:
+        columns = list(SUMMARY_COLUMNS)
+        columns.extend(key for row in rows for key in row
+                       if key not in columns)
+    if fmt == "csv":
+        import csv
+        writer = csv.DictWriter(outf, fieldnames=columns,
+                                extrasaction="ignore")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+    elif fmt == "yaml":
+        import yaml
+        yaml.dump([{key: row.get(key) for key in columns} for row in rows],
+                  outf, sort_keys=False)
+    else:
+        raise ValueError(f"Unknown table format: {fmt}")
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Summarize combozzle sqlite logs")
+    parser.add_argument("paths", nargs="+",
+        help="sqlite log files and/or directories to search for logs")
+    parser.add_argument("-o", "--output", default=None,
+        help="output file (default: stdout)")
+    parser.add_argument("--format", choices=["csv", "yaml"], default=None,
+        help="output format (default: from the output extension, else csv)")
+    parser.add_argument("--nwarmup", type=int, default=2,
+        help="number of leading steps excluded from the steady state")
+    args = parser.parse_args()
+
+    fmt = args.format
+    if fmt is None:
+        fmt = ("yaml" if args.output and args.output.endswith((".yaml", ".yml"))
+               else "csv")
+
+    summaries = summarize_logs(args.paths, nwarmup=args.nwarmup)
+    if args.output:
+        with open(args.output, "w", newline="") as outf:
+            write_table(summaries, outf, fmt=fmt)
+    else:
+        write_table(summaries, sys.stdout, fmt=fmt)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
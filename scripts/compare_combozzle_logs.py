@@ -0,0 +1,234 @@
+"""Compare two sets of combozzle sqlite logs case by case.
+
+The runs in a baseline and a candidate log directory are matched by
+(dim, order, number of elements, number of ranks). If a directory has
+several runs of one case, the latest is used. For each matched case, the
+report gives:
+
+- the steady-state speedup (baseline/candidate mean step time), with a
+  Welch t-test on the per-step times to tell real changes from noise,
+- the change in first-step (compile) time and startup time,
+- the change in peak (host and device) memory usage.
+
+A case is flagged as a regression if its steady-state step time grows by
+more than the threshold and the change is significant, or if its compile
+time or peak memory grows by more than their own thresholds (they are
+single measurements). The tool exits with a non-zero status if any case
+regressed, so that it can be used as a gate:
+
+> python scripts/compare_combozzle_logs.py grid_scale/3d/legacy_actx_logs \\
+      grid_scale/3d/fusion_p1p2_logs
+"""
+
+__copyright__ = """
+Copyright (C) 2020 University of Illinois Board of Trustees
+"""
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import sys
+import math
+import numpy as np
+
+from combozzle_logs import find_log_files, read_run_logs, get_rank_reduced, \
+    write_table
+
+
+CASE_KEYS = ["dim", "order", "nelements", "nranks"]
+
+MEMORY_QUANTITIES = ["memory_usage_gpu", "memory_usage_python"]
+
+COMPARISON_COLUMNS = [
+    *CASE_KEYS,
+    "base_step_mean", "new_step_mean", "speedup", "p_value",
+    "base_first_step", "new_first_step", "first_step_ratio",
+    "base_startup", "new_startup", "startup_ratio",
+    *[f"{prefix}_{name}" for name in MEMORY_QUANTITIES
+      for prefix in ["base", "new"]],
+    *[f"{name}_ratio" for name in MEMORY_QUANTITIES],
+    "regression"
+]
+
+
+def get_latest_runs(paths):
+    """Return the latest run of each case logged in *paths*, by case key."""
+    runs = read_run_logs(find_log_files(paths),
+                         quantities={"t_init", "t_step", *MEMORY_QUANTITIES})
+    latest = {}
+    for run in sorted(runs, key=lambda run: run["date"]):
+        latest[tuple(run[key] for key in CASE_KEYS)] = run
+    return latest
+
+
+def welch_t_test(a, b):
+    """Return the two-sided p-value of Welch's t-test for equal means.
+
+    The t distribution is approximated by a normal distribution, which is
+    adequate for the typical number of steps (and avoids a dependency on
+    :mod:`scipy`).
+    """
+    if len(a) < 2 or len(b) < 2:
+        return None
+    var_a = np.var(a, ddof=1) / len(a)
+    var_b = np.var(b, ddof=1) / len(b)
+    if var_a + var_b == 0:
+        return 0.0 if np.mean(a) != np.mean(b) else 1.0
+    t = (np.mean(a) - np.mean(b)) / math.sqrt(var_a + var_b)
+    return math.erfc(abs(t) / math.sqrt(2))
+
+
+def _ratio(new, base):
+    if new is None or base is None or not base:
+        return None
+    return new / base
+
+
+def _first(values):
+    return float(values[0]) if len(values) else None
+
+
+def _peak(values):
+    values = values[np.isfinite(values)]
+    return float(np.max(values)) if len(values) else None
+
+
+def compare_runs(base_run, new_run, nwarmup=2, threshold=0.05, alpha=0.05,
+                 compile_threshold=0.2, memory_threshold=0.1):
+    """Compare the timings and memory usage of two runs of one case."""
+    row = {key: base_run[key] for key in CASE_KEYS}
+
+    _, base_steps = get_rank_reduced(base_run, "t_step")
+    _, new_steps = get_rank_reduced(new_run, "t_step")
+    base_steady = base_steps[nwarmup:]
+    new_steady = new_steps[nwarmup:]
+
+    regression = []
+    if len(base_steady) and len(new_steady):
+        row["base_step_mean"] = float(np.mean(base_steady))
+        row["new_step_mean"] = float(np.mean(new_steady))
+        row["speedup"] = row["base_step_mean"] / row["new_step_mean"]
+        row["p_value"] = welch_t_test(base_steady, new_steady)
+        significant = row["p_value"] is None or row["p_value"] < alpha
+        if 1/row["speedup"] > 1 + threshold and significant:
+            regression.append("step")
+
+    row["base_first_step"] = _first(base_steps)
+    row["new_first_step"] = _first(new_steps)
+    row["first_step_ratio"] = _ratio(row["new_first_step"],
+                                     row["base_first_step"])
+    if (row["first_step_ratio"] or 0) > 1 + compile_threshold:
+        regression.append("compile")
+
+    row["base_startup"] = _first(get_rank_reduced(base_run, "t_init")[1])
+    row["new_startup"] = _first(get_rank_reduced(new_run, "t_init")[1])
+    row["startup_ratio"] = _ratio(row["new_startup"], row["base_startup"])
+
+    for name in MEMORY_QUANTITIES:
+        row[f"base_{name}"] = _peak(get_rank_reduced(base_run, name)[1])
+        row[f"new_{name}"] = _peak(get_rank_reduced(new_run, name)[1])
+        row[f"{name}_ratio"] = _ratio(row[f"new_{name}"], row[f"base_{name}"])
+        if (row[f"{name}_ratio"] or 0) > 1 + memory_threshold:
+            regression.append("memory")
+
+    row["regression"] = ",".join(sorted(set(regression)))
+    return row
+
+
+def compare_log_sets(base_paths, new_paths, **kwargs):
+    """Compare the matching cases of two sets of logs.
+
+    Returns the comparison rows of the matched cases, and the case keys
+    found in only one of the sets.
+    """
+    base_runs = get_latest_runs(base_paths)
+    new_runs = get_latest_runs(new_paths)
+    rows = [compare_runs(base_runs[key], new_runs[key], **kwargs)
+            for key in sorted(set(base_runs) & set(new_runs))]
+    unmatched = sorted(set(base_runs) ^ set(new_runs))
+    return rows, unmatched
+
+
+def _fmt(value, spec):
+    return "-" if value is None else format(value, spec)
+
+
+def print_report(rows):
+    print(f"{'d':>2} {'p':>2} {'nelem':>9} {'nr':>4} "
+          f"{'speedup':>8} {'p-value':>8} {'compile':>8} {'startup':>8} "
+          f"{'gpu mem':>8} {'host mem':>8}  regression")
+    for row in rows:
+        print(f"{row['dim']:>2} {row['order']:>2} {row['nelements']:>9} "
+              f"{row['nranks']:>4} "
+              f"{_fmt(row.get('speedup'), '8.3f')} "
+              f"{_fmt(row.get('p_value'), '8.2g')} "
+              f"{_fmt(row['first_step_ratio'], '8.3f')} "
+              f"{_fmt(row['startup_ratio'], '8.3f')} "
+              f"{_fmt(row['memory_usage_gpu_ratio'], '8.3f')} "
+              f"{_fmt(row['memory_usage_python_ratio'], '8.3f')}  "
+              f"{row['regression']}")
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Compare two sets of combozzle sqlite logs")
+    parser.add_argument("base", help="baseline log directory (or file)")
+    parser.add_argument("new", help="candidate log directory (or file)")
+    parser.add_argument("--threshold", type=float, default=0.05,
+        help="relative step time growth above which a change is a regression")
+    parser.add_argument("--compile-threshold", type=float, default=0.2,
+        dest="compile_threshold",
+        help="relative first-step time growth flagged as a regression")
+    parser.add_argument("--memory-threshold", type=float, default=0.1,
+        dest="memory_threshold",
+        help="relative peak memory growth flagged as a regression")
+    parser.add_argument("--alpha", type=float, default=0.05,
+        help="significance level for step time changes")
+    parser.add_argument("--nwarmup", type=int, default=2,
+        help="number of leading steps excluded from the steady state")
+    parser.add_argument("-o", "--output", default=None,
+        help="also write the comparison table to this CSV/YAML file")
+    args = parser.parse_args()
+
+    rows, unmatched = compare_log_sets(
+        [args.base], [args.new], nwarmup=args.nwarmup,
+        threshold=args.threshold, alpha=args.alpha,
+        compile_threshold=args.compile_threshold,
+        memory_threshold=args.memory_threshold)
+
+    print_report(rows)
+    if unmatched:
+        print(f"Unmatched cases (dim, order, nelements, nranks): {unmatched}")
+
+    if args.output:
+        fmt = "yaml" if args.output.endswith((".yaml", ".yml")) else "csv"
+        with open(args.output, "w", newline="") as outf:
+            write_table(rows, outf, fmt=fmt, columns=COMPARISON_COLUMNS)
+
+    regressions = [row for row in rows if row["regression"]]
+    if regressions:
+        print(f"{len(regressions)} of {len(rows)} case(s) regressed.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""Extract the compile overhead of each config from run.out transcripts.
+
+A transcript (e.g. ``grid_scale/3d/fusion_p1p2_logs/run.out``) holds the
+output of many combozzle runs, each starting with its command line
+(``python -m mpi4py ./combozzle.py -i ./run_config/case_p1s1.yaml --lazy``).
+It is read line by line, split at those command lines (and at the
+``#### Case i/n: ... ####`` markers of batch runs), and the times of
+the reported compilation steps are totaled by phase:
+
+- preprocess: ``preprocess_program on ...`` (and loopy ``...: preprocess:``)
+- transform: ``transform_dag: ...``
+- fusion: ``Loop Fusion: ...``
+- contraction: ``Array Contraction: completed ...``
+- codegen: ``...: generate code: ...``
+- build: ``build program: ...`` (the kernels of one source build report
+  the same time on consecutive lines, and are counted once)
+
+Steps that are reported from within the above (e.g.
+``fuse_same_discretization_entity_loops``) are not counted again. The
+totals are then joined with the ``t_init`` and first-step times of the
+sqlite logs in the transcript's directory, matched by the logged command
+line in order of occurrence, to show how much of the startup cost is
+compilation:
+
+> python scripts/compile_overhead.py grid_scale/3d/fusion_p1p2_logs/run.out
+"""
+
+__copyright__ = """
+Copyright (C) 2020 University of Illinois Board of Trustees
+"""
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import os
+import re
+import sys
+from collections import defaultdict
+
+from combozzle_logs import find_log_files, read_run_logs, get_rank_reduced, \
+    write_table
+
+
+COMMAND_RE = re.compile(r"(python\S*\s+(?:-\w+\s+)*-m\s+mpi4py\s+"
+                        r"\S*combozzle\.py.*?)\s*$")
+CASE_RE = re.compile(r"#### Case \d+/\d+: (?P<config>\S+) ####")
+CONFIG_RE = re.compile(r"-i\s+['\"]?(?P<config>[^\s'\"]+)")
+
+_COMPLETED = r": completed \((?P<time>[0-9.]+)s wall"
+PHASE_RES = [
+    ("preprocess", re.compile(r"^preprocess_program on '[^']*'" + _COMPLETED)),
+    ("preprocess", re.compile(r"^\S+: preprocess" + _COMPLETED)),
+    ("transform", re.compile(r"^transform_dag" + _COMPLETED)),
+    ("fusion", re.compile(r"^Loop Fusion" + _COMPLETED)),
+    ("contraction", re.compile(r"^Array Contraction" + _COMPLETED)),
+    ("codegen", re.compile(r"^\S+: generate code" + _COMPLETED)),
+]
+BUILD_RE = re.compile(r"^build program: kernel '[^']*' was part of a lengthy "
+                      r"(?:source|cache) .*\((?P<time>[0-9.]+) s\)")
+
+PHASES = ["preprocess", "transform", "fusion", "contraction", "codegen",
+          "build"]
+
+OVERHEAD_COLUMNS = [
+    "index", "config", "dim", "order", "nelements", "nranks",
+    *[f"t_{phase}" for phase in PHASES], "t_compile",
+    "nbuilds", "time_startup", "time_first_step", "compile_fraction",
+    "cmdline"
+]
+
+
+def _normalize_cmdline(cmdline):
+    return " ".join(cmdline.split())
+
+
+def parse_transcript(lines):
+    """Total the compile times by phase for each config in *lines*.
+
+    Returns a list of configs in order of occurrence, each a :class:`dict`
+    with the ``cmdline``, the ``config`` file and the per-phase times
+    ``t_<phase>``.
+    """
+    configs = []
+    current = None
+    last_build_time = None
+
+    def start_config(cmdline, config):
+        new_config = {"index": len(configs), "cmdline": cmdline,
+                      "config": config, "nbuilds": 0}
+        new_config.update({f"t_{phase}": 0. for phase in PHASES})
+        configs.append(new_config)
+        return new_config
+
+    for line in lines:
+        line = line.rstrip("\n")
+
+        # the command lines of the run scripts are echoed with their
+        # (unexpanded) variables before the runs start
+        match = COMMAND_RE.search(line)
+        if match and "$" not in match.group(1):
+            cmdline = _normalize_cmdline(match.group(1))
+            config_match = CONFIG_RE.search(cmdline)
+            current = start_config(
+                cmdline, config_match.group("config") if config_match else None)
+            current["batch"] = False
+            last_build_time = None
+            continue
+
+        match = CASE_RE.search(line)
+        if match and current is not None:
+            if current["batch"] or current["config"] != match.group("config"):
+                cmdline = current["cmdline"]
+                current = start_config(cmdline, match.group("config"))
+            current["batch"] = True
+            last_build_time = None
+            continue
+
+        if current is None:
+            continue
+
+        match = BUILD_RE.search(line)
+        if match:
+            build_time = float(match.group("time"))
+            if build_time != last_build_time:
+                current["t_build"] += build_time
+                current["nbuilds"] += 1
+            last_build_time = build_time
+            continue
+        last_build_time = None
+
+        for phase, phase_re in PHASE_RES:
+            match = phase_re.search(line)
+            if match:
+                current[f"t_{phase}"] += float(match.group("time"))
+                break
+
+    for config in configs:
+        config.pop("batch", None)
+        for phase in PHASES:
+            config[f"t_{phase}"] = round(config[f"t_{phase}"], 6)
+        config["t_compile"] = round(
+            sum(config[f"t_{phase}"] for phase in PHASES), 6)
+    return configs
+
+
+def join_with_logs(configs, log_paths):
+    """Add the run parameters and startup times of the matching logs.
+
+    The runs logged in *log_paths* are matched to *configs* by their
+    (logged) command line, in order of occurrence.
+    """
+    runs_by_cmdline = defaultdict(list)
+    runs = read_run_logs(find_log_files(log_paths),
+                         quantities={"t_init", "t_step"})
+    for run in sorted(runs, key=lambda run: run["date"]):
+        cmdline = run["constants"].get("cmdline")
+        if isinstance(cmdline, str):
+            runs_by_cmdline[_normalize_cmdline(cmdline)].append(run)
+
+    for config in configs:
+        matching_runs = runs_by_cmdline.get(config["cmdline"])
+        if not matching_runs:
+            continue
+        run = matching_runs.pop(0)
+        for key in ["dim", "order", "nelements", "nranks"]:
+            config[key] = run[key]
+
+        _, t_init = get_rank_reduced(run, "t_init")
+        _, t_step = get_rank_reduced(run, "t_step")
+        startup = 0.
+        if len(t_init):
+            config["time_startup"] = float(t_init[0])
+            startup += config["time_startup"]
+        if len(t_step):
+            config["time_first_step"] = float(t_step[0])
+            startup += config["time_first_step"]
+        if startup:
+            config["compile_fraction"] = config["t_compile"] / startup
+    return configs
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Extract compile overhead from combozzle run transcripts")
+    parser.add_argument("transcript", help="run.out transcript")
+    parser.add_argument("--logs", nargs="*", default=None,
+        help="sqlite logs (or directories) to join with (default: the "
+             "transcript's directory)")
+    parser.add_argument("-o", "--output", default=None,
+        help="output CSV/YAML file (default: CSV to stdout)")
+    args = parser.parse_args()
+
+    with open(args.transcript, errors="replace") as inf:
+        configs = parse_transcript(inf)
+
+    log_paths = args.logs
+    if log_paths is None:
+        log_paths = [os.path.dirname(os.path.abspath(args.transcript))]
+    join_with_logs(configs, log_paths)
+
+    if args.output:
+        fmt = "yaml" if args.output.endswith((".yaml", ".yml")) else "csv"
+        with open(args.output, "w", newline="") as outf:
+            write_table(configs, outf, fmt=fmt, columns=OVERHEAD_COLUMNS)
+    else:
+        write_table(configs, sys.stdout, columns=OVERHEAD_COLUMNS)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,11 +4,14 @@ exename="${1}"
 options="${2}"
 numparts="${3}"
 
-printf "Resetting cache directories.\n"
 export PYOPENCL_CTX="0:1"
 export XDG_CACHE_HOME="/tmp/$USER/xdg-scratch"
 export POCL_CACHE_DIR="/tmp/$USER/pocl-cache"
-rm -rf $XDG_CACHE_HOME $POCL_CACHE_DIR
+# Set KEEP_KERNEL_CACHES to time runs against caches warmed by --compile-only
+if [[ -z "${KEEP_KERNEL_CACHES}" ]]; then
+    printf "Resetting cache directories.\n"
+    rm -rf $XDG_CACHE_HOME $POCL_CACHE_DIR
+fi
 
 printf "Checking task info:\n"
 jsrun -r 1 -g 1 -a 1 -n ${numparts} js_task_info
@@ -0,0 +1,269 @@
+"""Generate and run a sweep of combozzle cases on a local multi-core node.
+
+A sweep spec (YAML, see ``config/sweep_grid_scale.yaml``) gives a base
+configuration, a matrix of parameter values (e.g. ``order`` and
+``weak_scale``), named feature toggles, the array context modes and the
+numbers of ranks. Its cross product is expanded into one combozzle input
+file per case, each in its own directory under the output directory:
+
+> python scripts/sweep_combozzle.py config/sweep_grid_scale.yaml -o sweep
+
+Cases whose rank-0 sqlite log already exists are skipped, so an interrupted
+(or extended) sweep can be resumed by running it again. The other cases run
+concurrently with ``mpirun``, as many at a time as their ranks (times
+the cores per rank) fit in the available cores, largest first. Each case's
+output goes to its ``run.out``, which begins with the command line like the
+transcripts parsed by ``scripts/compile_overhead.py``, and its logs can be
+summarized with ``scripts/combozzle_logs.py``.
+"""
+
+__copyright__ = """
+Copyright (C) 2020 University of Illinois Board of Trustees
+"""
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import os
+import sys
+import glob
+import time
+import shlex
+import itertools
+import subprocess
+import yaml
+
+
+DRIVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..",
+                      "combozzle.py")
+
+
+def load_sweep_spec(filename):
+    """Read the sweep spec in *filename*, with its base config merged in.
+
+    A ``base_config`` file is relative to the spec, and the ``base`` entries
+    override its values.
+    """
+    with open(filename) as inf:
+        spec = yaml.safe_load(inf)
+
+    base = {}
+    if spec.get("base_config"):
+        base_config = os.path.join(os.path.dirname(os.path.abspath(filename)),
+                                   spec["base_config"])
+        with open(base_config) as inf:
+            base.update(yaml.safe_load(inf))
+    base.update(spec.get("base") or {})
+
+    return {
+        "casename": spec.get("casename", "sweep"),
+        "base": base,
+        "matrix": spec.get("matrix") or {},
+        "features": spec.get("features") or {"base": {}},
+        "modes": spec.get("modes", ["lazy"]),
+        "nranks": spec.get("nranks", [1]),
+        "options": spec.get("options", []),
+    }
+
+
+def expand_sweep(spec):
+    """Return the cases of the cross product of the matrix in *spec*.
+
+    Each case is a :class:`dict` with its ``name``, its combozzle input
+    ``config``, whether it is ``lazy``, and its ``nranks``.
+    """
+    for mode in spec["modes"]:
+        if mode not in ["eager", "lazy"]:
+            raise ValueError(f"Unknown array context mode: {mode}")
+
+    matrix_keys = list(spec["matrix"])
+    cases = []
+    for values in itertools.product(*spec["matrix"].values()):
+        for feature, overrides in spec["features"].items():
+            for mode in spec["modes"]:
+                for nranks in spec["nranks"]:
+                    labels = [f"{key}{value}"
+                              for key, value in zip(matrix_keys, values)]
+                    name = "_".join([spec["casename"], *labels, feature,
+                                     mode, f"n{nranks}"])
+                    config = dict(spec["base"])
+                    config.update(zip(matrix_keys, values))
+                    config.update(overrides or {})
+                    config["casename"] = name
+                    cases.append({"name": name, "config": config,
+                                  "lazy": mode == "lazy", "nranks": nranks})
+    return cases
+
+
+def get_case_cost(case):
+    """Return a rough relative cost of *case*, to start the largest first."""
+    config = case["config"]
+    return (case["nranks"], config.get("weak_scale", 1)
+            * (config.get("order", 1) + 1)**config.get("dim", 3))
+
+
+def find_case_log(workdir, name):
+    """Return the rank-0 sqlite log of case *name* in *workdir*, if any."""
+    log_files = sorted(glob.glob(os.path.join(workdir,
+                                              f"{name}-*-rank0-*.sqlite")))
+    return log_files[-1] if log_files else None
+
+
+def write_case(case, outdir, mpirun, options):
+    """Write the input file of *case* and set up its command line."""
+    workdir = os.path.join(outdir, case["name"])
+    os.makedirs(workdir, exist_ok=True)
+    config_file = os.path.join(workdir, f"{case['name']}.yaml")
+    with open(config_file, "w") as outf:
+        yaml.dump(case["config"], outf, sort_keys=False)
+
+    cmd = [*shlex.split(mpirun.format(nranks=case["nranks"])),
+           sys.executable, "-m", "mpi4py", os.path.abspath(DRIVER),
+           "-i", os.path.basename(config_file), *options]
+    if case["lazy"]:
+        cmd.append("--lazy")
+
+    case.update({"workdir": workdir, "cmd": cmd})
+    return case
+
+
+def _start_case(case, cores_per_rank):
+    env = dict(os.environ)
+    # keep each rank's (pocl) device from spreading over all of the cores
+    env["POCL_MAX_PTHREAD_COUNT"] = str(cores_per_rank)
+    env["OMP_NUM_THREADS"] = str(cores_per_rank)
+
+    outf = open(os.path.join(case["workdir"], "run.out"), "w")
+    outf.write(" ".join(case["cmd"]) + "\n")
+    outf.flush()
+    case["start_time"] = time.perf_counter()
+    case["process"] = subprocess.Popen(case["cmd"], cwd=case["workdir"],
+                                       stdout=outf, stderr=subprocess.STDOUT,
+                                       env=env)
+    case["outf"] = outf
+
+
+def _finish_case(case, status):
+    case["wall_time"] = time.perf_counter() - case.pop("start_time")
+    case.pop("outf").close()
+    case.pop("process")
+    if status == "ok" and find_case_log(case["workdir"], case["name"]) is None:
+        status = "no log"
+    case["status"] = status
+    print(f"{case['name']}: {status} ({case['wall_time']:.1f} s)", flush=True)
+
+
+def run_cases(cases, ncores, cores_per_rank=1, timeout=None, poll_interval=1.):
+    """Run *cases* concurrently, packed into *ncores* cores.
+
+    Pending cases are started, largest first, as soon as their ranks fit in
+    the free cores. Only cores are accounted for: a case that needs more
+    than *ncores* cores is not skipped, but started (oversubscribed) once
+    all others have finished, and the memory of the concurrent cases is not
+    checked at all. Cases that share a device can run out of its memory;
+    the driver's ``memory_check`` only accounts for the memory free when
+    each case starts.
+    """
+    pending = sorted(cases, key=get_case_cost, reverse=True)
+    running = []
+    free_cores = ncores
+
+    while pending or running:
+        for case in list(pending):
+            case_cores = case["nranks"]*cores_per_rank
+            if case_cores <= free_cores or (not running and free_cores == ncores):
+                pending.remove(case)
+                print(f"Starting {case['name']} on {case_cores} core(s)",
+                      flush=True)
+                _start_case(case, cores_per_rank)
+                running.append(case)
+                free_cores -= case_cores
+
+        time.sleep(poll_interval)
+
+        for case in list(running):
+            returncode = case["process"].poll()
+            elapsed = time.perf_counter() - case["start_time"]
+            if returncode is None:
+                if timeout is None or elapsed < timeout:
+                    continue
+                case["process"].kill()
+                case["process"].wait()
+                status = "timeout"
+            else:
+                status = "ok" if returncode == 0 else f"failed ({returncode})"
+            running.remove(case)
+            free_cores += case["nranks"]*cores_per_rank
+            _finish_case(case, status)
+
+    return cases
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Generate and run a sweep of combozzle cases")
+    parser.add_argument("spec", help="sweep spec (YAML)")
+    parser.add_argument("-o", "--output", default="sweep",
+        help="output directory, with one subdirectory per case")
+    parser.add_argument("--ncores", type=int, default=os.cpu_count(),
+        help="number of cores to pack the cases into")
+    parser.add_argument("--cores-per-rank", type=int, default=1,
+        dest="cores_per_rank", help="number of cores for each rank")
+    parser.add_argument("--mpirun", default="mpirun -np {nranks}",
+        help="MPI launcher, with {nranks} for the number of ranks")
+    parser.add_argument("--timeout", type=float, default=None,
+        help="per-case timeout (s)")
+    parser.add_argument("--dry-run", action="store_true", dest="dry_run",
+        help="only write the input files and print the commands")
+    args = parser.parse_args()
+
+    spec = load_sweep_spec(args.spec)
+    cases = [write_case(case, args.output, args.mpirun, spec["options"])
+             for case in expand_sweep(spec)]
+
+    todo = []
+    for case in cases:
+        if find_case_log(case["workdir"], case["name"]) is not None:
+            case["status"] = "done"
+        else:
+            todo.append(case)
+    print(f"{len(cases)} case(s), {len(cases) - len(todo)} already done.")
+
+    if args.dry_run:
+        for case in todo:
+            print(f"(cd {case['workdir']} && {' '.join(case['cmd'])})")
+        return 0
+
+    start_time = time.perf_counter()
+    run_cases(todo, args.ncores, cores_per_rank=args.cores_per_rank,
+              timeout=args.timeout)
+    print(f"Ran {len(todo)} case(s) in {time.perf_counter() - start_time:.1f} s")
+
+    failed = [case["name"] for case in cases
+              if case["status"] not in ["ok", "done"]]
+    if failed:
+        print(f"{len(failed)} case(s) failed: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
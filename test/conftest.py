@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The driver and the scripts are not installed; import them from the tree
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [_ROOT, os.path.join(_ROOT, "scripts")]
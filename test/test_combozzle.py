@@ -0,0 +1,420 @@
+__copyright__ = """
+Copyright (C) 2020 University of Illinois Board of Trustees
+"""
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import os
+import numpy as np
+import pytest
+
+# The driver needs the whole mirgecom stack (and a CL device) to import
+combozzle = pytest.importorskip("combozzle")
+
+from arraycontext import (  # noqa: E402
+    thaw, pytest_generate_tests_for_array_contexts
+)
+from meshmode.array_context import (  # noqa: E402
+    PytestPyOpenCLArrayContextFactory
+)
+from pytools.obj_array import make_obj_array  # noqa: E402
+
+pytest_generate_tests = pytest_generate_tests_for_array_contexts(
+    [PytestPyOpenCLArrayContextFactory])
+
+
+class _SerialComm:
+    def Get_rank(self):  # noqa: N802
+        return 0
+
+    def bcast(self, obj, root=0):
+        return obj
+
+    def Barrier(self):  # noqa: N802
+        pass
+
+
+# {{{ distributed box mesh
+
+def _get_inter_part_groups(mesh):
+    from meshmode.mesh import InterPartAdjacencyGroup
+    return [fagrp for fagrps in mesh.facial_adjacency_groups
+            for fagrp in fagrps if isinstance(fagrp, InterPartAdjacencyGroup)]
+
+
+def _get_inter_part_nfaces(mesh):
+    nfaces = {}
+    for fagrp in _get_inter_part_groups(mesh):
+        nbr_rank = fagrp.ineighbor_partition
+        nfaces[nbr_rank] = nfaces.get(nbr_rank, 0) + len(fagrp.elements)
+    return nfaces
+
+
+def _get_linear_field_gradient(actx, comm, mesh, coeffs, order=2):
+    # Return the global L2 norms of the components of the (weak form, central
+    # flux) DG gradient of a linear field, and their max errors
+    import grudge.op as op
+    from grudge.dof_desc import DISCR_TAG_BASE, as_dofdesc
+    from grudge.eager import EagerDGDiscretization
+    from grudge.trace_pair import interior_trace_pairs
+    from meshmode.discretization.poly_element import \
+        default_simplex_group_factory
+    from meshmode.mesh import BTAG_ALL
+
+    discr = EagerDGDiscretization(
+        actx, mesh, discr_tag_to_group_factory={
+            DISCR_TAG_BASE: default_simplex_group_factory(base_dim=mesh.dim,
+                                                          order=order)},
+        mpi_communicator=comm)
+    nodes = thaw(discr.nodes(), actx)
+    u = sum(c*x for c, x in zip(coeffs, nodes))
+
+    def get_face_flux(dd, u_face):
+        normal = thaw(discr.normal(dd), actx)
+        return op.project(discr, dd, "all_faces", u_face*normal)
+
+    dd_bdry = as_dofdesc(BTAG_ALL)
+    flux = get_face_flux(dd_bdry, op.project(discr, "vol", dd_bdry, u))
+    for tpair in interior_trace_pairs(discr, u):
+        flux = flux + get_face_flux(tpair.dd, tpair.avg)
+    grad = -op.inverse_mass(discr, op.weak_local_grad(discr, u)
+                            - op.face_mass(discr, flux))
+
+    norms = [actx.to_numpy(op.norm(discr, g, 2)) for g in grad]
+    errors = [actx.to_numpy(op.norm(discr, g - c, np.inf))
+              for g, c in zip(grad, coeffs)]
+    return np.array(norms), np.array(errors)
+
+
+def _check_distributed_box_mesh(block_shape, periodic):
+    # Runs on each rank of an MPI job (see test_distributed_box_mesh)
+    from functools import partial
+    from math import factorial
+    from mpi4py import MPI
+    import pyopencl as cl
+    from grudge.array_context import get_reasonable_array_context_class
+
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+    dim = len(block_shape)
+    n = (9, 7, 5)[:dim]
+    a = (-1., 0., 0.5)[:dim]
+    b = (1., 1.5, 2.)[:dim]
+    ncells_axis = [npts - 1 for npts in n]
+
+    local_mesh, global_nelements = combozzle._get_distributed_box_mesh(
+        comm, dim, a, b, n, periodic=periodic, block_shape=block_shape)
+    ref_mesh, _ = combozzle._generate_and_distribute_box_mesh(
+        comm, partial(combozzle._get_box_mesh, dim, a=a, b=b, n=n,
+                      periodic=periodic),
+        a, b, ncells_axis, block_shape)
+
+    # the rank's block of cells, as in the partitioned global mesh
+    block_index = np.unravel_index(rank, block_shape)
+    block_ncells = 1
+    for ncells, nblocks, iblock in zip(ncells_axis, block_shape, block_index):
+        start, stop = combozzle._get_box_block_extent(ncells, nblocks, iblock)
+        block_ncells *= stop - start
+    assert local_mesh.nelements == factorial(dim)*block_ncells
+    assert local_mesh.nelements == ref_mesh.nelements
+    assert global_nelements == factorial(dim)*np.prod(ncells_axis)
+
+    inter_part_nfaces = _get_inter_part_nfaces(local_mesh)
+    assert inter_part_nfaces
+    assert inter_part_nfaces == _get_inter_part_nfaces(ref_mesh)
+
+    for i in range(dim):
+        if periodic[i] and block_shape[i] == 2:
+            # both cuts of the axis face the same rank, in two groups: one
+            # across the interior cut, one (offset by the period) across
+            # the periodic boundary
+            nbr_index = list(block_index)
+            nbr_index[i] = 1 - block_index[i]
+            nbr_rank = np.ravel_multi_index(nbr_index, block_shape)
+            offsets = sorted(fagrp.aff_map.offset[i]
+                             for fagrp in _get_inter_part_groups(local_mesh)
+                             if fagrp.ineighbor_partition == nbr_rank)
+            period = b[i] - a[i]
+            assert offsets == sorted([0, (1 - 2*block_index[i])*period])
+
+    cl_ctx = cl.create_some_context(interactive=False)
+    queue = cl.CommandQueue(cl_ctx)
+    actx_class = get_reasonable_array_context_class(lazy=False,
+                                                    distributed=True)
+    actx = actx_class(comm, queue, force_device_scalars=True)
+
+    coeffs = (1., -2., 0.5)[:dim]
+    norms, errors = _get_linear_field_gradient(actx, comm, local_mesh, coeffs)
+    ref_norms, ref_errors = _get_linear_field_gradient(actx, comm, ref_mesh,
+                                                       coeffs)
+    assert np.allclose(norms, ref_norms, rtol=1e-10)
+    assert np.allclose(errors, ref_errors, atol=1e-10)
+    if not any(periodic):
+        # exact for a linear field, which has no jumps
+        assert np.all(errors < 1e-10)
+
+
+@pytest.mark.parametrize(("nranks", "block_shape", "periodic"), [
+    (2, (2, 1), (False, False)),
+    # both cuts of the periodic axis face the same rank
+    (2, (2, 1), (True, False)),
+    (4, (2, 2), (False, False)),
+    (4, (2, 2), (True, False)),
+    (4, (4, 1), (True, False)),
+    (4, (1, 2, 2), (False, True, False)),
+])
+def test_distributed_box_mesh(nranks, block_shape, periodic):
+    import json
+    import shutil
+    import subprocess
+    import sys
+    pytest.importorskip("mpi4py")
+    mpiexec = shutil.which("mpiexec")
+    if mpiexec is None:
+        pytest.skip("mpiexec not found")
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    subprocess.run([mpiexec, "-n", str(nranks), sys.executable, "-m", "mpi4py",
+                    __file__, json.dumps([block_shape, periodic])],
+                   env=env, check=True)
+
+# }}}
+
+
+# {{{ box partitions
+
+@pytest.mark.parametrize(("ncells_axis", "nparts", "max_split_axes", "shape"), [
+    ((8, 8, 8), 8, None, (2, 2, 2)),
+    ((8, 8, 8), 1, None, (1, 1, 1)),
+    # the cuts go across the long axis
+    ((16, 4), 4, None, (4, 1)),
+    ((4, 16), 4, None, (1, 4)),
+    ((8, 8, 8), 4, 1, (1, 1, 4)),
+    ((8, 8, 8), 4, 2, (1, 2, 2)),
+    # an axis is never split into more blocks than it has cells
+    ((2, 64), 8, None, (1, 8)),
+])
+def test_box_block_shape(ncells_axis, nparts, max_split_axes, shape):
+    block_shape = combozzle._get_box_block_shape(ncells_axis, nparts,
+                                                 max_split_axes)
+    assert tuple(block_shape) == shape
+
+
+def test_box_block_shape_impossible():
+    with pytest.raises(combozzle.MyRuntimeError):
+        combozzle._get_box_block_shape((2, 2), 8)
+
+# }}}
+
+
+# {{{ mesh cache
+
+def test_mmap_pickle(tmp_path):
+    shared = np.arange(10.)
+    obj = {"a": shared, "b": [shared, np.eye(3, dtype=np.int32)],
+           "objects": np.array([None, "x"], dtype=object), "n": 3}
+    dirname = os.path.join(tmp_path, "obj")
+    combozzle._write_mmap_pickle(obj, dirname)
+    # one file per (distinct, non-object) array, besides the pickle
+    assert len(os.listdir(dirname)) == 3
+
+    loaded = combozzle._read_mmap_pickle(dirname)
+    assert isinstance(loaded["a"], np.memmap)
+    assert loaded["b"][0] is loaded["a"]
+    assert np.array_equal(loaded["a"], shared)
+    assert np.array_equal(loaded["b"][1], np.eye(3))
+    assert loaded["b"][1].dtype == np.int32
+    assert list(loaded["objects"]) == [None, "x"]
+    assert loaded["n"] == 3
+
+
+def test_mesh_cache_key():
+    key = combozzle._get_mesh_cache_key(dim=3, npts_axis=(9, 9, 9), nparts=2)
+    assert len(key) == 24
+    int(key, 16)
+    # independent of the order of the parameters
+    assert key == combozzle._get_mesh_cache_key(nparts=2, dim=3,
+                                                npts_axis=(9, 9, 9))
+    assert key != combozzle._get_mesh_cache_key(dim=3, npts_axis=(9, 9, 9),
+                                                nparts=4)
+
+
+def test_mesh_cache(tmp_path):
+    import time
+    comm = _SerialComm()
+    cache_dir = str(tmp_path)
+    assert combozzle._load_cached_mesh(comm, cache_dir, "old") is None
+
+    combozzle._store_cached_mesh(comm, cache_dir, "old",
+                                 {"nodes": np.zeros(1000)}, 8, {"nparts": 1})
+    os.utime(os.path.join(cache_dir, "old", "meta.yaml"), (1, 1))
+    recent = {"nodes": np.ones(1000)}
+    combozzle._store_cached_mesh(comm, cache_dir, "recent", recent, 8,
+                                 {"nparts": 2})
+    run_start_time = time.time() - 1
+
+    # a concurrent run stored the entry first: its copy is kept
+    combozzle._store_cached_mesh(comm, cache_dir, "recent",
+                                 {"nodes": np.zeros(10)}, 2, {"nparts": 2})
+    local_mesh, global_nelements = combozzle._load_cached_mesh(
+        comm, cache_dir, "recent")
+    assert global_nelements == 8
+    assert np.array_equal(local_mesh["nodes"], recent["nodes"])
+
+    # the old entry is evicted, the one used since the run started is not
+    combozzle._store_cached_mesh(comm, cache_dir, "new",
+                                 {"nodes": np.zeros(1000)}, 8, {"nparts": 4},
+                                 max_nbytes=0, run_start_time=run_start_time)
+    assert sorted(os.listdir(cache_dir)) == ["new", "recent"]
+
+# }}}
+
+
+# {{{ element subsets
+
+def _get_volume_discr(actx, order=2):
+    from meshmode.discretization import Discretization
+    from meshmode.discretization.poly_element import \
+        default_simplex_group_factory
+    mesh = combozzle._get_box_mesh(2, a=(0., 0.), b=(1., 1.), n=(5, 5),
+                                   periodic=(False, False))
+    return Discretization(actx, mesh,
+                          default_simplex_group_factory(base_dim=2, order=order))
+
+
+def _get_elements_beyond(actx, vol_discr, x0):
+    return [np.where(np.max(actx.to_numpy(xgrp), axis=1) > x0)[0]
+            for xgrp in thaw(vol_discr.nodes(), actx)[0]]
+
+
+def test_element_subset_connections(actx_factory):
+    actx = actx_factory()
+    vol_discr = _get_volume_discr(actx)
+    elements = _get_elements_beyond(actx, vol_discr, 0.6)
+    nsub_elements = sum(len(els) for els in elements)
+    assert 0 < nsub_elements < vol_discr.mesh.nelements
+
+    sub_discr, restrict, prolong = combozzle._get_element_subset_connections(
+        actx, vol_discr, elements)
+    assert sub_discr.mesh.nelements == nsub_elements
+
+    x = thaw(vol_discr.nodes(), actx)[0]
+    sub_x = restrict(x)
+    assert np.allclose(actx.to_numpy(sub_x[0]),
+                       actx.to_numpy(thaw(sub_discr.nodes(), actx)[0][0]))
+
+    # zero-filled outside of the subset
+    x_np = actx.to_numpy(x[0])
+    expected = np.zeros_like(x_np)
+    expected[elements[0]] = x_np[elements[0]]
+    assert np.allclose(actx.to_numpy(prolong(sub_x)[0]), expected)
+
+    empty = [np.zeros(0, dtype=np.int64) for _ in vol_discr.groups]
+    assert combozzle._get_element_subset_connections(
+        actx, vol_discr, empty) is None
+
+
+def test_sparse_sponge(actx_factory):
+    # The sponge forcing evaluated on the elements that reach into the
+    # sponge zone (and prolonged back) matches that on the whole volume
+    actx = actx_factory()
+    vol_discr = _get_volume_discr(actx)
+    x0 = 0.6
+    sponge = combozzle.InitSponge(x0=x0, thickness=0.4, amplitude=2.)
+
+    nodes = thaw(vol_discr.nodes(), actx)
+    field = 1 + nodes[0]*nodes[1]
+    ref_field = 0*nodes[0] + 3
+    full_forcing = sponge(x_vec=nodes)*(ref_field - field)
+
+    _, restrict, prolong = combozzle._get_element_subset_connections(
+        actx, vol_discr, _get_elements_beyond(actx, vol_discr, x0))
+    sub_nodes = make_obj_array([restrict(xi) for xi in nodes])
+    sparse_forcing = prolong(sponge(x_vec=sub_nodes)
+                             * (restrict(ref_field) - restrict(field)))
+
+    assert np.allclose(actx.to_numpy(sparse_forcing[0]),
+                       actx.to_numpy(full_forcing[0]))
+
+# }}}
+
+
+# {{{ frozen chemistry
+
+def _step_decay(chemistry_interval, nsteps, dt):
+    # Step y' = -y with RK4, treating the right-hand side as the chemistry
+    # source; returns y at each step and the source seen by each stage
+    from mirgecom.integrators import rk4_step
+    frozen = chemistry_interval > 1
+    stage_sources = []
+
+    def rhs(t, state):
+        source = combozzle._get_chemistry_rhs(state, chemistry_interval,
+                                              lambda: -state[0])
+        stage_sources.append(source)
+        if frozen:
+            return make_obj_array([source, 0*state[1], 0*state[2]])
+        return make_obj_array([source, 0*state[1]])
+
+    state = make_obj_array([1., 0., 0.] if frozen else [1., 0.])
+    ys = [state[0]]
+    for step in range(nsteps):
+        if frozen:
+            state = combozzle._update_frozen_chemistry(
+                step, state, chemistry_interval, lambda cv, tseed: -cv)
+        state = rk4_step(state, step*dt, dt, rhs)
+        ys.append(state[0])
+
+    return np.array(ys), np.array(stage_sources).reshape(nsteps, 4)
+
+
+def test_chemistry_interval_one():
+    # The source is evaluated at every stage, as without frozen chemistry
+    dt = 0.1
+    ys, stage_sources = _step_decay(1, nsteps=4, dt=dt)
+    growth = 1 - dt + dt**2/2 - dt**3/6 + dt**4/24
+    assert np.allclose(ys, growth**np.arange(5))
+    assert len(set(stage_sources[0])) == 4
+
+
+def test_chemistry_interval_held():
+    dt = 0.1
+    interval = 3
+    ys, stage_sources = _step_decay(interval, nsteps=7, dt=dt)
+    for step in range(7):
+        # updated from the state at the last multiple of the interval, and
+        # held for all stages of the steps in between
+        update_step = step - step % interval
+        assert np.all(stage_sources[step] == -ys[update_step])
+    # y therefore decreases linearly between updates
+    assert np.allclose(ys[1:interval+1], ys[0]*(1 - dt*np.arange(1, interval+1)))
+
+# }}}
+
+
+if __name__ == "__main__":
+    # run on each rank of the MPI job started by test_distributed_box_mesh
+    import json
+    import sys
+    block_shape, periodic = json.loads(sys.argv[1])
+    _check_distributed_box_mesh(tuple(block_shape), tuple(periodic))
+
+# vim: foldmethod=marker
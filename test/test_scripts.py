@@ -0,0 +1,189 @@
+__copyright__ = """
+Copyright (C) 2020 University of Illinois Board of Trustees
+"""
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+import numpy as np
+import pytest
+
+from combozzle_logs import parse_log_filename, summarize_run
+from combozzle_cost_model import nnls
+from compare_combozzle_logs import welch_t_test
+from compile_overhead import parse_transcript
+from sweep_combozzle import expand_sweep
+
+
+def test_parse_log_filename():
+    params = parse_log_filename(
+        "logs/combozzle-d3p2e98304n4-rank1-20220404-234503.sqlite")
+    assert params == {"casename": "combozzle", "dim": 3, "order": 2,
+                      "nelements": 98304, "nranks": 4, "rank": 1,
+                      "date": "20220404-234503"}
+
+    # casenames may contain dashes
+    assert parse_log_filename(
+        "my-case-d2p1e32n1-rank0-20220404-003820.sqlite")["casename"] \
+        == "my-case"
+
+    assert parse_log_filename("combozzle-d3p2e98304n4-rank1.sqlite") is None
+    assert parse_log_filename("run.out") is None
+
+
+def _make_run(quantities):
+    run = {"casename": "combozzle", "dim": 3, "order": 1, "nelements": 384,
+           "nranks": len(quantities["t_step"]), "date": "20220404-234503",
+           "quantities": {}}
+    for name, per_rank in quantities.items():
+        run["quantities"][name] = {
+            rank: (np.arange(len(values)), np.array(values, dtype=np.float64))
+            for rank, values in enumerate(per_rank)}
+    return run
+
+
+def test_summarize_run():
+    t_step = [10., 5.] + [1.]*10
+    run = _make_run({
+        "t_init": [[100.], [120.]],
+        # the slowest rank counts at each step
+        "t_step": [t_step, [s/2 for s in t_step[:-1]] + [3.]],
+    })
+    summary = summarize_run(run, nwarmup=2)
+
+    assert summary["casename"] == "combozzle"
+    assert summary["nranks"] == 2
+    assert summary["nsteps"] == 12
+    assert summary["time_startup"] == 120.
+    assert summary["time_first_step"] == 10.
+    assert summary["time_middle_7"] == 7.
+    assert summary["time_middle_8"] == 8.
+    assert summary["step_median"] == 1.
+    assert summary["step_max"] == 3.
+    assert summary["step_mean"] == pytest.approx(1.2)
+    assert "dofs_per_s" not in summary
+
+
+def test_summarize_run_short():
+    summary = summarize_run(_make_run({"t_step": [[10., 5.]]}), nwarmup=2)
+    assert summary["nsteps"] == 2
+    assert summary["time_startup"] is None
+    assert summary["time_middle_8"] is None
+    assert "step_mean" not in summary
+
+
+TRANSCRIPT = """\
+mpirun -np 1 python -m mpi4py ./combozzle.py -i $CONFIG --lazy
+python -m mpi4py ./combozzle.py -i ./run_config/case_p1s1.yaml --lazy
+transform_dag: completed (1.5s wall 1.00x CPU)
+Loop Fusion: completed (2.0s wall 1.00x CPU)
+build program: kernel 'frozen_result' was part of a lengthy source build \
+resulting from a binary cache miss (3.00 s)
+build program: kernel 'frozen_other' was part of a lengthy source build \
+resulting from a binary cache miss (3.00 s)
+python -m mpi4py ./combozzle.py -i ./run_config/case_p1s8.yaml --lazy
+#### Case 1/2: ./run_config/case_p1s8.yaml ####
+Array Contraction: completed (0.5s wall 1.00x CPU)
+#### Case 2/2: ./run_config/case_p2s8.yaml ####
+frozen_result: generate code: completed (0.25s wall 1.00x CPU)
+"""
+
+
+def test_parse_transcript():
+    configs = parse_transcript(TRANSCRIPT.splitlines(keepends=True))
+
+    # the echoed command line (with a variable) does not start a config
+    assert [config["config"] for config in configs] == [
+        "./run_config/case_p1s1.yaml", "./run_config/case_p1s8.yaml",
+        "./run_config/case_p2s8.yaml"]
+
+    first, second, third = configs
+    assert first["t_transform"] == 1.5
+    assert first["t_fusion"] == 2.
+    # the kernels of one source build report the same time, once
+    assert first["t_build"] == 3.
+    assert first["nbuilds"] == 1
+    assert first["t_compile"] == 6.5
+
+    assert second["t_contraction"] == 0.5
+    assert second["t_compile"] == 0.5
+    assert third["t_codegen"] == 0.25
+    assert third["cmdline"] == second["cmdline"]
+
+
+def test_welch_t_test():
+    rng = np.random.default_rng(seed=17)
+    a = rng.normal(1., .1, size=50)
+
+    assert welch_t_test(a[:1], a) is None
+    assert welch_t_test(a, a) == pytest.approx(1.)
+    assert welch_t_test(np.ones(5), np.ones(5)) == 1.
+    assert welch_t_test(np.ones(5), 2*np.ones(5)) == 0.
+
+    b = rng.normal(1.2, .1, size=50)
+    assert welch_t_test(a, b) < 1e-6
+    assert welch_t_test(a, b) == pytest.approx(welch_t_test(b, a))
+    assert welch_t_test(a, rng.normal(1., .1, size=50)) > 0.01
+
+
+def test_expand_sweep():
+    spec = {
+        "casename": "sweep",
+        "base": {"dim": 3, "order": 1, "nviz": 100},
+        "matrix": {"order": [1, 2], "weak_scale": [1, 8]},
+        "features": {"base": {}, "no_av": {"artificial_viscosity_on": 0}},
+        "modes": ["eager", "lazy"],
+        "nranks": [1],
+    }
+    cases = expand_sweep(spec)
+
+    assert len(cases) == 2*2*2*2
+    assert len({case["name"] for case in cases}) == len(cases)
+
+    case = {case["name"]: case for case in cases}[
+        "sweep_order2_weak_scale8_no_av_lazy_n1"]
+    assert case["lazy"]
+    assert case["nranks"] == 1
+    assert case["config"] == {
+        "dim": 3, "order": 2, "nviz": 100, "weak_scale": 8,
+        "artificial_viscosity_on": 0,
+        "casename": "sweep_order2_weak_scale8_no_av_lazy_n1"}
+    # the base config is not modified
+    assert spec["base"] == {"dim": 3, "order": 1, "nviz": 100}
+
+    with pytest.raises(ValueError):
+        expand_sweep(dict(spec, modes=["fast"]))
+
+
+def test_nnls():
+    rng = np.random.default_rng(seed=17)
+    a = rng.random((20, 3))
+    x = np.array([1., 0., 2.])
+    assert np.allclose(nnls(a, a @ x), x)
+
+    # the unconstrained least squares solution has a negative coefficient
+    b = a @ np.array([1., -1., 2.])
+    x, *_ = np.linalg.lstsq(a, b, rcond=None)
+    assert x[1] < 0
+    x = nnls(a, b)
+    assert np.all(x >= 0)
+    assert x[1] == 0
+    # optimal on the remaining terms
+    assert np.allclose(a[:, [0, 2]].T @ (a @ x - b), 0)